@@ -0,0 +1,241 @@
+"""Compact append-only store for productivity check results.
+
+Each check is one fixed-width binary record (timestamp, work flag, bitmask of
+matched terms) appended to a single file. Reads memory-map the file and stream
+over it, so aggregate queries over months of checks run in constant memory.
+
+    python activity_timeline.py report --by day --days 30
+    python activity_timeline.py streaks --days 7 --min-checks 3
+"""
+import argparse
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Constants
+TIMELINE_FILE = 'activity_timeline.bin'
+CHECK_INTERVAL = 300  # Seconds represented by one check, matches assistant.py
+MAGIC = b'ACTL'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')  # magic, version, record size
+RECORD = struct.Struct('<dB3xI')  # timestamp, is_work, matched-term bitmask
+MAX_TERMS = 32
+
+class ActivityTimeline:
+    def __init__(self, path=TIMELINE_FILE):
+        self.path = path
+        self.terms_path = path + '.terms.json'
+        self.lock = threading.Lock()
+        self.terms = []
+        if os.path.exists(self.terms_path):
+            with open(self.terms_path) as f:
+                self.terms = json.load(f)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            with open(path, 'rb') as f:
+                magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"{path} is not a version {VERSION} activity timeline")
+
+    def term_mask(self, matched_terms):
+        """Map matched terms to a bitmask, registering new terms in the sidecar vocabulary."""
+        mask = 0
+        for term in matched_terms:
+            if term not in self.terms:
+                if len(self.terms) >= MAX_TERMS:
+                    logger.warning(f"Timeline term vocabulary full, not recording '{term}'")
+                    continue
+                self.terms.append(term)
+                with open(self.terms_path, 'w') as f:
+                    json.dump(self.terms, f)
+            mask |= 1 << self.terms.index(term)
+        return mask
+
+    def append(self, is_work, matched_terms=(), timestamp=None):
+        """Append one check result."""
+        if timestamp is None:
+            timestamp = time.time()
+        self.extend([(timestamp, is_work, matched_terms)])
+
+    def extend(self, entries):
+        """Append many (timestamp, is_work, matched_terms) check results in one write.
+
+        Range queries bisect on timestamp, so a timestamp earlier than the last
+        record (e.g. after the wall clock steps back) is clamped to it.
+        """
+        with self.lock:
+            with open(self.path, 'rb+') as f:
+                last = self.last_timestamp(f)
+                records = []
+                for timestamp, is_work, terms in entries:
+                    if last is not None and timestamp < last:
+                        logger.warning(f"Timeline timestamp {timestamp} is before the last record {last}, clamping")
+                        timestamp = last
+                    records.append(RECORD.pack(timestamp, bool(is_work), self.term_mask(terms)))
+                    last = timestamp
+                f.seek(0, os.SEEK_END)
+                f.write(b''.join(records))
+
+    def last_timestamp(self, f):
+        """Return the timestamp of the last record in the open file, or None if it is empty."""
+        size = f.seek(0, os.SEEK_END)
+        if size < HEADER.size + RECORD.size:
+            return None
+        f.seek(HEADER.size + ((size - HEADER.size) // RECORD.size - 1) * RECORD.size)
+        return struct.unpack('<d', f.read(8))[0]
+
+    def __len__(self):
+        return (os.path.getsize(self.path) - HEADER.size) // RECORD.size
+
+    def records(self, start=None, end=None):
+        """Yield (timestamp, is_work, term_mask) for checks in [start, end), oldest first."""
+        count = len(self)
+        if count == 0:
+            return
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            timestamps = _TimestampView(mm, count)
+            first = bisect.bisect_left(timestamps, start) if start is not None else 0
+            last = bisect.bisect_left(timestamps, end) if end is not None else count
+            view = memoryview(mm)[HEADER.size + first * RECORD.size:HEADER.size + last * RECORD.size]
+            try:
+                yield from RECORD.iter_unpack(view)
+            finally:
+                view.release()
+
+    def aggregate(self, bucket='day', start=None, end=None, check_interval=CHECK_INTERVAL):
+        """Summarize checks per local hour or day: focus ratio, focus time and distraction streaks."""
+        rows = []
+        row = None
+        bucket_end = None
+        streak = 0
+        for timestamp, is_work, mask in self.records(start, end):
+            if bucket_end is None or timestamp >= bucket_end:
+                bucket_start = _bucket_start(timestamp, bucket)
+                bucket_end = _bucket_end(bucket_start, bucket)
+                row = {'start': bucket_start.timestamp(), 'checks': 0, 'work_checks': 0,
+                       'longest_distraction': 0, 'masks': {}}
+                rows.append(row)
+                streak = 0
+            row['checks'] += 1
+            if is_work:
+                row['work_checks'] += 1
+                streak = 0
+            else:
+                streak += 1
+                if streak > row['longest_distraction']:
+                    row['longest_distraction'] = streak
+            if mask:
+                # Count distinct masks per bucket and expand them to terms once, at the end
+                row['masks'][mask] = row['masks'].get(mask, 0) + 1
+        for row in rows:
+            row['terms'] = {}
+            for mask, count in row.pop('masks').items():
+                for bit, term in enumerate(self.terms):
+                    if mask & (1 << bit):
+                        row['terms'][term] = row['terms'].get(term, 0) + count
+            row['focus_ratio'] = row['work_checks'] / row['checks']
+            row['focus_seconds'] = row['work_checks'] * check_interval
+            row['longest_distraction_seconds'] = row['longest_distraction'] * check_interval
+        return rows
+
+    def distraction_streaks(self, start=None, end=None, min_checks=2):
+        """Yield (first_timestamp, last_timestamp, checks) for runs of consecutive non-work checks."""
+        run_start = run_end = None
+        run_length = 0
+        for timestamp, is_work, _ in self.records(start, end):
+            if is_work:
+                if run_length >= min_checks:
+                    yield run_start, run_end, run_length
+                run_length = 0
+            else:
+                if run_length == 0:
+                    run_start = timestamp
+                run_end = timestamp
+                run_length += 1
+        if run_length >= min_checks:
+            yield run_start, run_end, run_length
+
+class _TimestampView:
+    """Sequence of record timestamps in a mapped timeline, for bisect."""
+
+    def __init__(self, mm, count):
+        self.mm = mm
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return struct.unpack_from('<d', self.mm, HEADER.size + index * RECORD.size)[0]
+
+def _bucket_start(timestamp, bucket):
+    moment = datetime.fromtimestamp(timestamp)
+    if bucket == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if bucket == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown bucket: {bucket}")
+
+def _bucket_end(bucket_start, bucket):
+    if bucket == 'hour':
+        return (bucket_start + timedelta(hours=1)).timestamp()
+    # Step by calendar day rather than 86400 seconds so DST changes land on midnight
+    next_day = (bucket_start + timedelta(days=1, hours=12)).replace(hour=0)
+    return next_day.timestamp()
+
+def _format_duration(seconds):
+    return f"{int(seconds // 3600)}h{int(seconds % 3600 // 60):02d}m"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the productivity activity timeline.")
+    parser.add_argument('--file', default=TIMELINE_FILE)
+    parser.add_argument('--days', type=float, default=7, help="look back this many days (0 = everything)")
+    parser.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    commands = parser.add_subparsers(dest='command', required=True)
+    report = commands.add_parser('report', help="focus ratio per hour or day")
+    report.add_argument('--by', choices=['hour', 'day'], default='day')
+    streaks = commands.add_parser('streaks', help="runs of consecutive distracted checks")
+    streaks.add_argument('--min-checks', type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file):
+        print(f"No timeline found at {args.file}", file=sys.stderr)
+        return 1
+    timeline = ActivityTimeline(args.file)
+    start = time.time() - args.days * 86400 if args.days else None
+
+    if args.command == 'report':
+        rows = timeline.aggregate(args.by, start)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+            return 0
+        label_format = '%Y-%m-%d %H:00' if args.by == 'hour' else '%Y-%m-%d'
+        print(f"{'period':<17}{'checks':>7}{'focus':>7}{'focus time':>12}{'longest distraction':>21}  top terms")
+        for row in rows:
+            top_terms = ', '.join(term for term, _ in sorted(row['terms'].items(), key=lambda item: -item[1])[:3])
+            print(f"{datetime.fromtimestamp(row['start']).strftime(label_format):<17}{row['checks']:>7}"
+                  f"{row['focus_ratio']:>7.0%}{_format_duration(row['focus_seconds']):>12}"
+                  f"{_format_duration(row['longest_distraction_seconds']):>21}  {top_terms}")
+    else:
+        runs = list(timeline.distraction_streaks(start, min_checks=args.min_checks))
+        if args.json:
+            print(json.dumps([{'start': first, 'end': last, 'checks': checks} for first, last, checks in runs], indent=2))
+            return 0
+        for first, last, checks in runs:
+            print(f"{datetime.fromtimestamp(first):%Y-%m-%d %H:%M} - {datetime.fromtimestamp(last):%H:%M}  "
+                  f"{checks} checks")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
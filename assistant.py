@@ -7,12 +7,13 @@ import re
 import time
 import threading
 import queue
-import pyautogui
-import pytesseract
 from PIL import Image
-import os
-import subprocess
 from datetime import datetime
+from speech_pipeline import PipelinedSpeechEngine
+from activity_timeline import ActivityTimeline
+from model_warmup import ModelWarmer
+from prompts import ASSISTANT_SYSTEM_PROMPT
+from productivity_monitor import ProductivityMonitor, TesseractNotFoundError, create_screen_analyzer, setup_tesseract
 
 # Set up logging
 log_file = 'productivity_assistant.log'
@@ -32,6 +33,11 @@ MAX_TOKENS = 500
 CHECK_INTERVAL = 300  # 5 minutes
 CHUNK_SIZE = 250
 SPEECH_RATE = 300
+PIPELINED_SPEECH = True  # Synthesize upcoming sentences ahead of playback
+SEMANTIC_CLASSIFIER = False  # Fall back to embedding similarity when no keyword matches
+MONITOR_PROCESS = True  # Run screen checks in a separate process instead of a thread
+MODEL_WARMUP = True  # Pre-evaluate the system prompt at startup and send keep-alives while idle
+CACHE_SLOT = None  # llama.cpp slot to pin the conversation to (None = let the server choose)
 
 class ThreadSafeSpeechEngine:
     def __init__(self):
@@ -97,16 +103,19 @@ class ThreadSafeSpeechEngine:
             if self.engine:
                 self.engine.setProperty(name, value)
 
-class TesseractNotFoundError(Exception):
-    """Custom exception for when Tesseract is not found."""
-    pass
-
 class ProductivityAssistant:
     def __init__(self):
-        self.speech_engine = ThreadSafeSpeechEngine()
+        if PIPELINED_SPEECH:
+            self.speech_engine = PipelinedSpeechEngine()
+        else:
+            self.speech_engine = ThreadSafeSpeechEngine()
         self.speech_engine.initialize()
         self.speech_rate = SPEECH_RATE
         self.speech_engine.set_property('rate', self.speech_rate)
+        self.timeline = ActivityTimeline()
+        self.analyzer = None
+        self.monitor = None
+        self.warmer = None
 
     def speak_text(self, text):
         """Speak the given text using the thread-safe speech engine."""
@@ -119,36 +128,9 @@ class ProductivityAssistant:
         self.speech_engine.set_property('rate', self.speech_rate)
         logger.info("Speech engine initialized")
 
-    def find_tesseract_mac(self):
-        """Find Tesseract executable on macOS."""
-        logger.info("Searching for Tesseract executable")
-        common_paths = [
-            '/opt/homebrew/bin/tesseract',
-            '/usr/local/bin/tesseract',
-        ]
-        
-        for path in common_paths:
-            if os.path.isfile(path):
-                logger.info(f"Tesseract found at: {path}")
-                return path
-        
-        try:
-            path = subprocess.check_output(['which', 'tesseract']).decode().strip()
-            logger.info(f"Tesseract found at: {path}")
-            return path
-        except subprocess.CalledProcessError:
-            logger.error("Tesseract not found in system PATH")
-            return None
-
     def setup_tesseract(self):
         """Set up Tesseract OCR."""
-        tesseract_cmd = self.find_tesseract_mac()
-        if tesseract_cmd:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
-            logger.info(f"Tesseract set up successfully at: {tesseract_cmd}")
-        else:
-            logger.error("Tesseract executable not found")
-            raise TesseractNotFoundError("Tesseract executable not found. Please install Tesseract OCR using Homebrew.")
+        setup_tesseract()
 
     def generate_text_stream(self, prompt, api_url=API_URL, max_tokens=MAX_TOKENS):
         """Generate text using the llama.cpp API and yield chunks as they arrive."""
@@ -156,8 +138,13 @@ class ProductivityAssistant:
         payload = {
             "prompt": prompt,
             "n_predict": max_tokens,
-            "stream": True
+            "stream": True,
+            "cache_prompt": True
         }
+        if CACHE_SLOT is not None:
+            payload["id_slot"] = CACHE_SLOT
+        if self.warmer:
+            self.warmer.touch(prompt)
         headers = {
             "Content-Type": "application/json"
         }
@@ -196,6 +183,13 @@ class ProductivityAssistant:
                 current_chunk = sentence
             else:
                 current_chunk += sentence
+            # A run-on with no sentence end is cut at a word boundary so the buffer stays bounded
+            while len(current_chunk) > chunk_size:
+                cut = current_chunk.rfind(' ', 0, chunk_size)
+                if cut <= 0:
+                    cut = chunk_size
+                chunks.append(current_chunk[:cut].strip())
+                current_chunk = current_chunk[cut:]
         if current_chunk:
             chunks.append(current_chunk.strip())
         logger.debug(f"Text split into {len(chunks)} chunks")
@@ -203,21 +197,19 @@ class ProductivityAssistant:
 
     def take_screenshot_and_analyze(self):
         """Take a screenshot, perform OCR, and check if the content is work-related."""
-        logger.info("Taking screenshot for productivity analysis")
-        screenshot = pyautogui.screenshot()
-        
-        try:
-            text = pytesseract.image_to_string(screenshot)
-            logger.debug(f"OCR extracted text: {text[:100]}...")  # Log first 100 chars
-            
-            work_related_keywords = ['code', 'python', 'project', 'task', 'deadline', 'meeting']
-            is_work_related = any(keyword in text.lower() for keyword in work_related_keywords)
-            
-            logger.info(f"Screenshot analysis result: work-related = {is_work_related}")
-            return is_work_related
-        except Exception as e:
-            logger.error(f"Error in OCR processing: {e}")
-            return True  # Assume work-related in case of errors
+        return self.analyzer.analyze()
+
+    def handle_check_result(self, timestamp, is_work_related, matched_keywords, seconds=None):
+        """Record a productivity check and remind the user if they seem distracted."""
+        if seconds is not None:
+            logger.info(f"Productivity check took {seconds:.2f} s: work-related = {is_work_related}")
+        if matched_keywords is not None:
+            self.timeline.append(is_work_related, matched_keywords, timestamp)
+        if not is_work_related:
+            reminder = "It seems you might be distracted. Remember to focus on your work tasks."
+            logger.info("Productivity reminder triggered")
+            print("\nProductivity Reminder:", reminder)
+            self.speak_text(reminder)
 
     def productivity_check_thread(self):
         """Thread function to periodically check productivity."""
@@ -225,12 +217,8 @@ class ProductivityAssistant:
         while True:
             time.sleep(CHECK_INTERVAL)
             try:
-                is_work_related = self.take_screenshot_and_analyze()
-                if not is_work_related:
-                    reminder = "It seems you might be distracted. Remember to focus on your work tasks."
-                    logger.info("Productivity reminder triggered")
-                    print("\nProductivity Reminder:", reminder)
-                    self.speak_text(reminder)
+                is_work_related, matched_keywords = self.take_screenshot_and_analyze()
+                self.handle_check_result(time.time(), is_work_related, matched_keywords)
             except Exception as e:
                 logger.error(f"Error in productivity check: {e}")
 
@@ -291,14 +279,24 @@ class ProductivityAssistant:
 
         self.initialize_speech_engine()
         
+        if MODEL_WARMUP:
+            self.warmer = ModelWarmer(API_URL, [ASSISTANT_SYSTEM_PROMPT], slot=CACHE_SLOT)
+            self.warmer.start()
+        
         logger.info(f"Initial speech rate set to {self.speech_rate}")
         print(f"Current speech rate: {self.speech_rate} words per minute")
         
-        productivity_thread = threading.Thread(target=self.productivity_check_thread, name="ProductivityThread")
-        productivity_thread.start()
+        if MONITOR_PROCESS:
+            self.monitor = ProductivityMonitor(self.handle_check_result, CHECK_INTERVAL,
+                                               factory_args=(SEMANTIC_CLASSIFIER,))
+            self.monitor.start()
+        else:
+            self.analyzer = create_screen_analyzer(SEMANTIC_CLASSIFIER)
+            productivity_thread = threading.Thread(target=self.productivity_check_thread, name="ProductivityThread")
+            productivity_thread.start()
         
         conversation = [
-            "<|system|>\nYou are a helpful AI assistant.<|end|>\n"
+            ASSISTANT_SYSTEM_PROMPT
         ]
         
         while True:
@@ -322,6 +320,10 @@ class ProductivityAssistant:
                 logger.error(f"An error occurred in main loop: {e}", exc_info=True)
                 print(f"An error occurred. Please check the logs for details.")
 
+        if self.monitor:
+            self.monitor.stop()
+        if self.warmer:
+            self.warmer.stop()
         self.speech_engine.stop()
         logger.info("Productivity Assistant shutting down")
 
@@ -4,11 +4,18 @@ import time
 from threading import Event, Thread
 import requests
 import json
+from prompts import SUMMARY_PROMPT, SUMMARY_PROMPT_PREFIX
+from model_warmup import ModelWarmer
+from bounded_text import MAX_SELECTION_BYTES, TextBuffer, capture_command, fit_to_token_budget
 
 # Global debug flag
 DEBUG = True
 API_URL = "http://localhost:8080/completion"
 MAX_TOKENS = 500
+MODEL_WARMUP = True  # Pre-evaluate the summary prompt at startup and send keep-alives while idle
+MAX_INPUT_TOKENS = 3000  # Selections longer than this are cut down before they reach the prompt
+TRUNCATION_STRATEGY = 'head_tail'  # 'head_tail' or 'sample'
+MAX_SUMMARY_CHARS = 8000  # A runaway summary is cut here and the rest of the stream is not read
 
 def log(message):
     """Print debug messages if DEBUG is True"""
@@ -26,32 +33,38 @@ class TextReader:
         # Keys tracking
         self.keys_pressed = set()
         
+        # Load the model and cache the summary prompt before the first hotkey
+        self.warmer = None
+        if MODEL_WARMUP:
+            log("Warming up model in the background...")
+            self.warmer = ModelWarmer(API_URL, [SUMMARY_PROMPT_PREFIX])
+            self.warmer.start()
+        
         # Test the speech
         self.speak("System ready", test=True)
         log("Initialization complete!")
 
     def generate_summary(self, text):
         """Generate a summary using the llama.cpp API"""
-        prompt = f"""<|system|>
-You are a helpful AI assistant that provides concise summaries.
-<|end|>
-<|user|>
-Provide a brief, clear summary of the following text in 2-3 sentences, give a more detailed summary or explanation for code that is more than 10 lines:
-
-{text}
-<|end|>
-<|assistant|>"""
+        fitted = fit_to_token_budget(text, MAX_INPUT_TOKENS, TRUNCATION_STRATEGY)
+        if len(fitted) < len(text):
+            log(f"Selection truncated from {len(text)} to {len(fitted)} characters ({TRUNCATION_STRATEGY})")
+        prompt = SUMMARY_PROMPT.format(text=fitted)
 
         payload = {
             "prompt": prompt,
             "n_predict": MAX_TOKENS,
-            "stream": True
+            "stream": True,
+            "cache_prompt": True
         }
         headers = {
             "Content-Type": "application/json"
         }
 
-        summary = ""
+        if self.warmer:
+            self.warmer.touch(prompt)
+        
+        summary = TextBuffer(MAX_SUMMARY_CHARS)
         try:
             with requests.post(API_URL, data=json.dumps(payload), headers=headers, stream=True) as response:
                 if response.status_code == 200:
@@ -62,8 +75,8 @@ Provide a brief, clear summary of the following text in 2-3 sentences, give a mo
                                 decoded_line = line.decode('utf-8')
                                 if decoded_line.startswith('data: '):
                                     data = json.loads(decoded_line[6:])
-                                    if 'content' in data:
-                                        summary += data['content']
+                                    if 'content' in data and not summary.append(data['content']):
+                                        break  # Closing the response also frees the server slot
                             except json.JSONDecodeError:
                                 log(f"Failed to decode JSON: {decoded_line}")
                 else:
@@ -73,7 +86,9 @@ Provide a brief, clear summary of the following text in 2-3 sentences, give a mo
             log(f"Request failed: {e}")
             return "Error: Failed to connect to the LLM API. Please check if the server is running."
 
-        return summary.strip()
+        if summary.truncated:
+            log(f"Summary cut off at {MAX_SUMMARY_CHARS} characters")
+        return summary.text().strip()
 
     def speak(self, text, test=False):
         """Speak text using macOS say command with Samantha voice"""
@@ -116,11 +131,13 @@ Provide a brief, clear summary of the following text in 2-3 sentences, give a mo
                 kb.tap('c')
             time.sleep(0.1)
             
-            result = subprocess.run(['pbpaste'], capture_output=True, text=True)
-            text = result.stdout.strip()
+            captured = capture_command(['pbpaste'], MAX_SELECTION_BYTES, subprocess_module=subprocess)
+            text = captured.text.strip()
             
             if text:
-                log(f"\nCaptured text: {text[:100]}...")
+                log(f"\nCaptured {captured.total_bytes} bytes (sha256 {captured.sha256[:12]}): {text[:100]}...")
+                if captured.truncated:
+                    log(f"Selection larger than {MAX_SELECTION_BYTES} bytes; kept its start and end")
                 return text
             else:
                 log("No text captured")
@@ -156,6 +173,8 @@ Provide a brief, clear summary of the following text in 2-3 sentences, give a mo
                   hasattr(key, 'char') and key.char == 'e'):
                 log("Quit hotkey detected!")
                 subprocess.run(['killall', 'say'])
+                if self.warmer:
+                    self.warmer.stop()
                 self.should_stop.set()
                 return False
                 
@@ -0,0 +1,230 @@
+"""Summarize many files concurrently with the same prompts as the hotkey services.
+
+Inputs may be files, directories (searched recursively), glob patterns, or
+'-' to summarize text from stdin. Each summary is appended to a JSONL file as
+soon as it is ready. Re-running with the same output skips documents whose
+content has already been summarized, so an interrupted run picks up where it
+stopped.
+
+    python batch_summarize.py src/ docs/*.md -o summaries.jsonl
+    cat notes.txt | python batch_summarize.py - --backend openai
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+
+from prompts import SUMMARY_PROMPT, OPENAI_SUMMARY_SYSTEM_PROMPT
+
+# Constants
+API_URL = "http://localhost:8080/completion"
+OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
+MODEL_NAME = "gpt-4o-mini"
+MAX_TOKENS = 500
+OPENAI_MAX_TOKENS = 150
+MAX_INPUT_CHARS = 24000  # Keep prompts inside a typical context window
+DEFAULT_CONCURRENCY = {'llama': 4, 'openai': 8}  # llama: match the server's --parallel slots
+DEFAULT_EXTENSIONS = ['.py', '.js', '.ts', '.go', '.rs', '.java', '.c', '.h', '.cpp', '.rb', '.sh',
+                      '.md', '.rst', '.txt', '.html', '.json', '.yaml', '.yml', '.toml']
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', 'build', 'dist'}
+
+def log(message):
+    print(message, file=sys.stderr)
+
+class LlamaBackend:
+    def __init__(self, api_url=API_URL):
+        self.api_url = api_url
+        self.local = threading.local()
+
+    @property
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def summarize(self, text):
+        """Return (summary, completion_tokens) for the given text."""
+        payload = {
+            "prompt": SUMMARY_PROMPT.format(text=text),
+            "n_predict": MAX_TOKENS,
+            "cache_prompt": True,
+        }
+        response = self.session.post(self.api_url, json=payload, timeout=600)
+        response.raise_for_status()
+        data = response.json()
+        return data['content'].strip(), data.get('tokens_predicted', 0)
+
+class OpenAIBackend(LlamaBackend):
+    def __init__(self, api_url=OPENAI_API_URL, api_key=None, model=MODEL_NAME):
+        super().__init__(api_url)
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.model = model
+        if not self.api_key:
+            raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY")
+
+    def summarize(self, text):
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": OPENAI_SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": text},
+            ],
+            "temperature": 0.3,
+            "max_tokens": OPENAI_MAX_TOKENS,
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        response = self.session.post(self.api_url, json=payload, headers=headers, timeout=600)
+        response.raise_for_status()
+        data = response.json()
+        return data['choices'][0]['message']['content'].strip(), data.get('usage', {}).get('completion_tokens', 0)
+
+def expand_inputs(specs, extensions=DEFAULT_EXTENSIONS):
+    """Yield file paths (or '-') for the given files, directories and glob patterns, without duplicates."""
+    seen = set()
+    for spec in specs:
+        if spec == '-':
+            candidates = ['-']
+        elif os.path.isdir(spec):
+            candidates = []
+            for root, dirs, files in os.walk(spec):
+                dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+                candidates.extend(os.path.join(root, name) for name in sorted(files)
+                                  if os.path.splitext(name)[1].lower() in extensions)
+        elif os.path.isfile(spec):
+            candidates = [spec]
+        else:
+            candidates = sorted(glob.glob(spec, recursive=True))
+            if not candidates:
+                log(f"No files match {spec}")
+        for path in candidates:
+            if path not in seen and (path == '-' or os.path.isfile(path)):
+                seen.add(path)
+                yield path
+
+def read_document(path, stdin_text=None):
+    """Return (text, sha256) for a document, or (None, None) for binary files."""
+    if path == '-':
+        data = stdin_text.encode('utf-8')
+    else:
+        with open(path, 'rb') as f:
+            data = f.read()
+    if b'\0' in data[:8192]:
+        return None, None
+    return data.decode('utf-8', errors='replace'), hashlib.sha256(data).hexdigest()
+
+def load_completed(output_path):
+    """Return the (source, sha256) pairs already summarized successfully in the output file."""
+    completed = set()
+    if os.path.exists(output_path):
+        with open(output_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partial line from an interrupted run
+                if 'summary' in record:
+                    completed.add((record['source'], record['sha256']))
+    return completed
+
+def summarize_document(backend, path, stdin_text, max_chars):
+    start = time.perf_counter()
+    try:
+        text, digest = read_document(path, stdin_text)
+    except OSError as e:
+        return {'source': path, 'error': str(e), 'seconds': round(time.perf_counter() - start, 3)}
+    if text is None:
+        return {'source': path, 'skipped': 'binary'}
+    record = {'source': path, 'sha256': digest, 'chars': len(text)}
+    if len(text) > max_chars:
+        text = text[:max_chars]
+        record['truncated'] = True
+    try:
+        record['summary'], record['tokens'] = backend.summarize(text)
+    except Exception as e:
+        record['error'] = str(e)
+    record['seconds'] = round(time.perf_counter() - start, 3)
+    return record
+
+def summarize_batch(paths, backend, output_path, concurrency, stdin_text=None, max_chars=MAX_INPUT_CHARS):
+    """Summarize documents with at most `concurrency` requests in flight; return run statistics."""
+    completed = load_completed(output_path)
+    stats = {'done': 0, 'skipped': 0, 'errors': 0, 'tokens': 0}
+    start = time.perf_counter()
+    with open(output_path, 'a') as output, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = set()
+        paths = iter(paths)
+        exhausted = False
+        while pending or not exhausted:
+            # Keep the queue short so huge trees are walked lazily, not all at once
+            while not exhausted and len(pending) < concurrency * 2:
+                path = next(paths, None)
+                if path is None:
+                    exhausted = True
+                    break
+                if completed:
+                    try:
+                        _, digest = read_document(path, stdin_text)
+                    except OSError:
+                        digest = None  # Let the worker report the error
+                    if (path, digest) in completed:
+                        stats['skipped'] += 1
+                        continue
+                pending.add(executor.submit(summarize_document, backend, path, stdin_text, max_chars))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                if 'skipped' in record:
+                    stats['skipped'] += 1
+                    continue
+                output.write(json.dumps(record) + '\n')
+                output.flush()
+                if 'error' in record:
+                    stats['errors'] += 1
+                    log(f"Failed: {record['source']}: {record['error']}")
+                else:
+                    stats['done'] += 1
+                    stats['tokens'] += record['tokens']
+                    log(f"Summarized {record['source']} in {record['seconds']:.1f} s")
+    stats['seconds'] = time.perf_counter() - start
+    stats['docs_per_second'] = stats['done'] / stats['seconds'] if stats['seconds'] else 0.0
+    stats['tokens_per_second'] = stats['tokens'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help="files, directories, glob patterns, or - for stdin")
+    parser.add_argument('-o', '--output', default='summaries.jsonl')
+    parser.add_argument('--backend', choices=['llama', 'openai'], default='llama')
+    parser.add_argument('--api-url', help="override the backend's API URL")
+    parser.add_argument('--concurrency', type=int, help="requests in flight (default: 4 llama, 8 openai)")
+    parser.add_argument('--max-chars', type=int, default=MAX_INPUT_CHARS)
+    parser.add_argument('--ext', action='append', help="file extensions to include from directories")
+    args = parser.parse_args(argv)
+
+    backend_class = LlamaBackend if args.backend == 'llama' else OpenAIBackend
+    try:
+        backend = backend_class(args.api_url) if args.api_url else backend_class()
+    except ValueError as e:
+        print(f"Setup error: {e}")
+        return 1
+    concurrency = args.concurrency or DEFAULT_CONCURRENCY[args.backend]
+    stdin_text = sys.stdin.read() if '-' in args.inputs else None
+    paths = expand_inputs(args.inputs, args.ext or DEFAULT_EXTENSIONS)
+
+    stats = summarize_batch(paths, backend, args.output, concurrency, stdin_text, args.max_chars)
+    log(f"\n{stats['done']} summarized, {stats['skipped']} skipped, {stats['errors']} failed "
+        f"in {stats['seconds']:.1f} s: {stats['docs_per_second']:.2f} docs/s, "
+        f"{stats['tokens_per_second']:.1f} tokens/s")
+    return 1 if stats['errors'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
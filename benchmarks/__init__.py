@@ -0,0 +1 @@
+"""Headless benchmarks for the assistant scripts. Run from the repo root with `python -m benchmarks.<name>`."""
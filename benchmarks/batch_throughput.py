@@ -0,0 +1,47 @@
+"""Throughput of batch_summarize.py against the local fake server at several concurrency levels.
+
+    python -m benchmarks.batch_throughput --docs 40 --slots 4 --token-rate 50
+"""
+import argparse
+import os
+import tempfile
+
+from batch_summarize import LlamaBackend, OpenAIBackend, expand_inputs, summarize_batch
+from benchmarks.fake_server import serve
+
+def write_documents(directory, count):
+    for i in range(count):
+        with open(os.path.join(directory, f"doc_{i:04d}.md"), 'w') as f:
+            f.write(f"# Document {i}\n\n" + "Some text worth summarizing. " * (50 + i % 200))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=40)
+    parser.add_argument('--slots', type=int, default=4, help="parallel slots on the fake server")
+    parser.add_argument('--token-rate', type=float, default=200, help="tokens per second per request")
+    parser.add_argument('--tokens', type=int, default=64, help="tokens generated per summary")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--backend', choices=['llama', 'openai'], default='llama')
+    args = parser.parse_args()
+
+    # The backends ask for MAX_TOKENS; cap the server so --tokens sets the summary length
+    server = serve(token_rate=args.token_rate, slots=args.slots, default_tokens=args.tokens, max_tokens=args.tokens)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            documents = os.path.join(directory, 'docs')
+            os.mkdir(documents)
+            write_documents(documents, args.docs)
+            for concurrency in args.concurrency:
+                output = os.path.join(directory, f"summaries_{concurrency}.jsonl")
+                if args.backend == 'llama':
+                    backend = LlamaBackend(server.url + '/completion')
+                else:
+                    backend = OpenAIBackend(server.url + '/v1/chat/completions', api_key='fake')
+                stats = summarize_batch(expand_inputs([documents]), backend, output, concurrency)
+                print(f"concurrency {concurrency:>2}: {stats['done']} docs in {stats['seconds']:.2f} s, "
+                      f"{stats['docs_per_second']:.2f} docs/s, {stats['tokens_per_second']:.0f} tokens/s")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Fake hardware and OS drivers so the assistant scripts run headless on Linux.
+
+install_fakes() puts stand-ins for pyttsx3, pynput, pyautogui and mss (and
+for pytesseract and dotenv when they are unavailable) into sys.modules. Call
+it before importing assistant.py or background_service.py. The fakes record
+when speech was requested so flows can report time to first audio.
+"""
+import contextlib
+import io
+import shutil
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+class SpeechRecorder:
+    """Collects the times at which text was handed to a speech driver."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.utterances = []
+
+    def record(self, text):
+        with self.lock:
+            self.utterances.append((time.perf_counter(), text))
+
+    def first_after(self, start):
+        with self.lock:
+            times = [at for at, _ in self.utterances if at >= start]
+        return min(times) if times else None
+
+    def reset(self):
+        with self.lock:
+            self.utterances = []
+
+    # Plugged into PipelinedSpeechEngine in place of pyttsx3 synthesis and afplay
+    def synthesize(self, text, properties):
+        return text
+
+    def play(self, text):
+        self.record(text)
+
+class FakeEngine:
+    """pyttsx3 engine that records utterances instead of speaking."""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.properties = {'rate': 200}
+
+    def say(self, text, name=None):
+        self.recorder.record(text)
+
+    def save_to_file(self, text, path):
+        self.recorder.record(text)
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+    def connect(self, topic, callback):
+        pass
+
+    def isBusy(self):
+        return False
+
+    def iterate(self):
+        pass
+
+    def startLoop(self, use_driver_loop=True):
+        pass
+
+    def endLoop(self):
+        pass
+
+    def runAndWait(self):
+        pass
+
+    def stop(self):
+        pass
+
+class FakeProcess:
+    def __init__(self, returncode=0, stdout=''):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = ''
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+class FakeSubprocess(types.SimpleNamespace):
+    """Replacement for the `subprocess` module inside background_service.py and chatgpt_assistant.py.
+
+    pbpaste returns the fake clipboard, say is recorded as speech, anything
+    else (killall, which) succeeds without doing anything.
+    """
+
+    def __init__(self, recorder, clipboard=''):
+        import subprocess
+        super().__init__(CalledProcessError=subprocess.CalledProcessError, PIPE=subprocess.PIPE)
+        self.recorder = recorder
+        self.clipboard = clipboard
+
+    def run(self, args, **kwargs):
+        if args[0] == 'pbpaste':
+            return FakeProcess(stdout=self.clipboard)
+        return FakeProcess()
+
+    def Popen(self, args, **kwargs):
+        if args[0] == 'pbpaste':
+            return FakeProcess(stdout=io.BytesIO(self.clipboard.encode('utf-8')))
+        if args[0] == 'say':
+            self.recorder.record(args[-1])
+        return FakeProcess()
+
+class FakeDisplay:
+    """The screen the fake mss module captures: an RGB frame at a Retina-style pixel ratio."""
+
+    def __init__(self, frame=None, pixel_ratio=2):
+        self.pixel_ratio = pixel_ratio
+        self.show(np.full((1800, 2880, 3), 255, dtype=np.uint8) if frame is None else frame)
+
+    def show(self, frame):
+        """Put an RGB frame on screen; mss hands out BGRA bytes."""
+        frame = np.asarray(frame)
+        self.height, self.width = frame.shape[:2]
+        bgra = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        bgra[..., :3] = frame[..., 2::-1]
+        bgra[..., 3] = 255
+        self.raw = bgra.tobytes()
+
+def fake_mss_module(display):
+    mss = types.ModuleType('mss')
+
+    class MSS:
+        @property
+        def monitors(self):
+            region = {'left': 0, 'top': 0, 'width': display.width // display.pixel_ratio,
+                      'height': display.height // display.pixel_ratio}
+            return [region, dict(region)]  # 0 = all monitors, 1 = primary
+
+        def grab(self, region):
+            return types.SimpleNamespace(raw=display.raw, width=display.width, height=display.height)
+
+        def close(self):
+            pass
+
+    mss.mss = MSS
+    return mss
+
+def fake_keyboard_module():
+    keyboard = types.ModuleType('pynput.keyboard')
+
+    class Key:
+        cmd = 'cmd'
+        shift = 'shift'
+
+    class KeyCode:
+        def __init__(self, char):
+            self.char = char
+
+    class Controller:
+        @contextlib.contextmanager
+        def pressed(self, key):
+            yield
+
+        def tap(self, key):
+            pass
+
+    class Listener:
+        def __init__(self, on_press=None, on_release=None):
+            self.on_press = on_press
+            self.on_release = on_release
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def join(self):
+            pass
+
+    keyboard.Key, keyboard.KeyCode, keyboard.Controller, keyboard.Listener = Key, KeyCode, Controller, Listener
+    return keyboard
+
+def install_fakes(recorder, ocr_text=None, display=None):
+    """Install fake driver modules; returns the names that were replaced.
+
+    The fake mss captures `display` (a blank screen by default), so the real
+    capture backend and preprocessing run headless.
+
+    pytesseract is only faked when the tesseract binary is missing or ocr_text
+    is given, so OCR timings are real whenever they can be.
+    """
+    pyttsx3 = types.ModuleType('pyttsx3')
+    pyttsx3.init = lambda driverName=None, debug=False: FakeEngine(recorder)
+
+    pynput = types.ModuleType('pynput')
+    pynput.keyboard = fake_keyboard_module()
+
+    pyautogui = types.ModuleType('pyautogui')
+    pyautogui.screenshot = lambda: None
+    pyautogui.size = lambda: (1440, 900)
+
+    modules = {'pyttsx3': pyttsx3, 'pynput': pynput, 'pynput.keyboard': pynput.keyboard, 'pyautogui': pyautogui,
+               'mss': fake_mss_module(display or FakeDisplay())}
+
+    try:
+        import dotenv  # noqa: F401
+    except ImportError:
+        dotenv = types.ModuleType('dotenv')
+        dotenv.load_dotenv = lambda *args, **kwargs: False
+        modules['dotenv'] = dotenv
+
+    if ocr_text is not None or shutil.which('tesseract') is None:
+        pytesseract = types.ModuleType('pytesseract')
+        pytesseract.pytesseract = types.SimpleNamespace(tesseract_cmd='tesseract')
+        pytesseract.image_to_string = lambda image, *args, **kwargs: ocr_text or ''
+        modules['pytesseract'] = pytesseract
+
+    sys.modules.update(modules)
+    return sorted(modules)
+
+def press_hotkey(reader, char):
+    """Simulate Cmd+Shift+<char> on a TextReader."""
+    from pynput import keyboard
+    reader.keys_pressed.update({keyboard.Key.cmd, keyboard.Key.shift})
+    try:
+        return reader.on_press(keyboard.KeyCode(char))
+    finally:
+        reader.keys_pressed.clear()
@@ -0,0 +1,240 @@
+"""Local fake llama.cpp / OpenAI server for headless benchmarks.
+
+Serves llama.cpp's /completion (streaming and not) and OpenAI's
+/v1/chat/completions, generating filler tokens at a configurable rate with a
+limited number of parallel slots, like a real server started with --parallel.
+It can also model cold starts: loading the model on first use or after it has
+been idle long enough to be paged out, and evaluating prompt tokens that are
+not already in a slot's prompt cache. Token timing can be jittered, requests
+can fail at random, and a stream recorded with benchmarks.record_stream can be
+replayed with its original timing.
+
+    python -m benchmarks.fake_server --port 8080 --token-rate 50 --slots 4
+    python -m benchmarks.fake_server --cold-start 3 --evict-after 60 --prompt-rate 500
+    python -m benchmarks.fake_server --jitter 0.5 --failure-rate 0.1 --failure-mode disconnect
+    python -m benchmarks.fake_server --replay stream.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ['the', 'model', 'summarizes', 'this', 'text', 'into', 'a', 'short', 'clear', 'answer.']
+
+class FakeServerConfig:
+    def __init__(self, token_rate=50.0, slots=4, default_tokens=64, cold_start=0.0, evict_after=0.0, prompt_rate=0.0,
+                 jitter=0.0, failure_rate=0.0, failure_mode='status', replay=None, seed=0, max_tokens=0):
+        self.token_rate = token_rate
+        self.slots = slots
+        self.default_tokens = default_tokens
+        self.cold_start = cold_start  # Seconds to load the model
+        self.evict_after = evict_after  # Idle seconds before the model must be loaded again (0 = never)
+        self.prompt_rate = prompt_rate  # Prompt tokens evaluated per second (0 = free)
+        self.jitter = jitter  # Each token delay varies by up to this fraction
+        self.failure_rate = failure_rate  # Fraction of requests that fail
+        self.failure_mode = failure_mode  # 'status': answer 503, 'disconnect': drop the stream halfway
+        self.replay = replay  # [(delay, content), ...] recorded stream served instead of filler tokens
+        self.seed = seed
+        self.max_tokens = max_tokens  # Cap on tokens per response, whatever the client asks for (0 = none)
+
+def load_recording(path):
+    """Load a stream recorded by benchmarks.record_stream as [(delay, content), ...]."""
+    with open(path) as f:
+        return [(entry['delay'], entry['content']) for entry in map(json.loads, f) if 'content' in entry]
+
+class FakeLlamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, FakeRequestHandler)
+        self.config = config
+        self.slot_semaphore = threading.Semaphore(config.slots)
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+        self.random = random.Random(config.seed)
+        self.requests_served = 0
+        self.failures = 0
+        self.model_loaded = False
+        self.last_used = time.monotonic()
+        self.slot_prompts = [''] * config.slots
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve on a background thread and return self."""
+        threading.Thread(target=self.serve_forever, name="FakeLlamaServer", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def ensure_loaded(self):
+        """Pay the cold-start cost if the model was never loaded or has been evicted."""
+        with self.load_lock:
+            idle = time.monotonic() - self.last_used
+            if not self.model_loaded or (self.config.evict_after and idle > self.config.evict_after):
+                time.sleep(self.config.cold_start)
+                self.model_loaded = True
+            self.last_used = time.monotonic()
+
+    def evaluate_prompt(self, body):
+        """Sleep for the prompt tokens missing from the chosen slot's cache, then cache the prompt."""
+        prompt = body.get('prompt', '')
+        if not isinstance(prompt, str):
+            prompt = json.dumps(prompt)
+        with self.lock:
+            slot = body.get('id_slot', -1)
+            if not 0 <= slot < len(self.slot_prompts):
+                slot = max(range(len(self.slot_prompts)),
+                           key=lambda i: len(os.path.commonprefix([self.slot_prompts[i], prompt])))
+            cached = len(os.path.commonprefix([self.slot_prompts[slot], prompt])) if body.get('cache_prompt') else 0
+            self.slot_prompts[slot] = prompt
+        if self.config.prompt_rate:
+            time.sleep((len(prompt) - cached) / 4 / self.config.prompt_rate)  # ~4 characters per token
+
+    def should_fail(self):
+        with self.lock:
+            failed = self.random.random() < self.config.failure_rate
+            self.failures += failed
+            return failed
+
+    def token_delays(self, count):
+        """Yield the delay before each of `count` tokens, with jitter applied."""
+        spread = self.config.jitter
+        for _ in range(count):
+            with self.lock:
+                jitter = self.random.uniform(-spread, spread)
+            yield max(0.0, (1 + jitter) / self.config.token_rate)
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def send_json(self, body, status=200):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def generate(self, count):
+        """Yield up to `count` tokens, paced at the configured rate or replayed with recorded timing."""
+        replay = self.server.config.replay
+        if replay:
+            schedule = replay[:count]
+        else:
+            delays = self.server.token_delays(count)
+            schedule = ((delay, WORDS[i % len(WORDS)] + ' ') for i, delay in enumerate(delays))
+        deadline = time.perf_counter()
+        for delay, content in schedule:
+            deadline += delay
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+            yield content
+
+    def do_POST(self):
+        body = self.read_json()
+        with self.server.lock:
+            self.server.requests_served += 1
+        with self.server.slot_semaphore:
+            self.server.ensure_loaded()
+            failing = self.server.should_fail()
+            if failing and self.server.config.failure_mode == 'status':
+                self.send_json({'error': {'code': 503, 'message': "Fake server failure"}}, status=503)
+            elif self.path == '/completion':
+                self.server.evaluate_prompt(body)
+                self.completion(body, disconnect=failing)
+            elif self.path == '/v1/chat/completions':
+                self.chat_completion(body)
+            else:
+                self.send_json({'error': {'message': f"Unknown endpoint {self.path}"}}, status=404)
+            self.server.last_used = time.monotonic()
+
+    def completion(self, body, disconnect=False):
+        count = body.get('n_predict', self.server.config.default_tokens)
+        if count < 0:
+            count = self.server.config.default_tokens
+        if self.server.config.max_tokens:
+            count = min(count, self.server.config.max_tokens)
+        if not body.get('stream'):
+            tokens = list(self.generate(count))
+            self.send_json({'content': ''.join(tokens), 'tokens_predicted': len(tokens), 'stop': True})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        sent = 0
+        try:
+            for token in self.generate(count):
+                if disconnect and sent >= count // 2:
+                    break
+                self.write_chunk(f"data: {json.dumps({'content': token, 'stop': False})}\n\n")
+                sent += 1
+            if disconnect:
+                self.close_connection = True
+                return
+            self.write_chunk(f"data: {json.dumps({'content': '', 'stop': True, 'tokens_predicted': sent})}\n\n")
+            self.write_chunk('')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client stopped reading, like a cancelled generation
+
+    def write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def chat_completion(self, body):
+        count = body.get('max_tokens') or self.server.config.default_tokens
+        if self.server.config.max_tokens:
+            count = min(count, self.server.config.max_tokens)
+        tokens = list(self.generate(count))
+        self.send_json({
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': ''.join(tokens)},
+                         'finish_reason': 'length'}],
+            'usage': {'completion_tokens': len(tokens)},
+        })
+
+def serve(host='127.0.0.1', port=0, **config):
+    """Start a fake server on a background thread; port 0 picks a free port."""
+    return FakeLlamaServer((host, port), FakeServerConfig(**config)).start()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--token-rate', type=float, default=50, help="tokens per second per request")
+    parser.add_argument('--slots', type=int, default=4, help="requests generated in parallel")
+    parser.add_argument('--cold-start', type=float, default=0, help="seconds to load the model")
+    parser.add_argument('--evict-after', type=float, default=0, help="idle seconds before the model is evicted")
+    parser.add_argument('--prompt-rate', type=float, default=0, help="prompt tokens evaluated per second")
+    parser.add_argument('--jitter', type=float, default=0, help="fractional variation of each token delay")
+    parser.add_argument('--failure-rate', type=float, default=0, help="fraction of requests that fail")
+    parser.add_argument('--failure-mode', choices=['status', 'disconnect'], default='status')
+    parser.add_argument('--replay', help="serve a stream recorded with benchmarks.record_stream")
+    parser.add_argument('--max-tokens', type=int, default=0, help="cap on tokens per response (0 = none)")
+    args = parser.parse_args()
+    config = FakeServerConfig(args.token_rate, args.slots, cold_start=args.cold_start,
+                              evict_after=args.evict_after, prompt_rate=args.prompt_rate,
+                              jitter=args.jitter, failure_rate=args.failure_rate, failure_mode=args.failure_mode,
+                              replay=load_recording(args.replay) if args.replay else None,
+                              max_tokens=args.max_tokens)
+    server = FakeLlamaServer((args.host, args.port), config)
+    print(f"Fake llama.cpp server listening on {server.url}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Peak Python memory for huge clipboard selections and very long responses, before and after bounding.
+
+The selection is streamed from a child process standing in for pbpaste. The
+before case reads it the way get_selected_text used to (subprocess.run with
+capture_output) and formats all of it into the summary prompt; the after case
+runs the real get_selected_text and prompt building. The response is streamed
+from the fake server; the before case accumulates it into one string, the
+after case runs the real generate_summary, which stops reading at
+MAX_SUMMARY_CHARS. Normal summaries are already bounded by n_predict, so
+MAX_TOKENS is raised to --tokens to model a runaway generation. A run-on
+response with no sentence ends is also pushed through assistant.py's
+process_response.
+
+    python -m benchmarks.memory_bounds --selection-mb 50 --tokens 100000
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import requests
+
+from benchmarks.drivers import FakeSubprocess, SpeechRecorder, install_fakes
+from benchmarks.fake_server import serve
+from prompts import SUMMARY_PROMPT
+
+PASTE_SCRIPT = (
+    "import sys\n"
+    "line = b'def fib(n):  # ' + b'x' * 50 + b'\\n'\n"
+    "block = line * (65536 // len(line))\n"
+    "remaining = int(sys.argv[1])\n"
+    "while remaining > 0:\n"
+    "    sys.stdout.buffer.write(block[:remaining])\n"
+    "    remaining -= len(block)\n"
+)
+
+def measure(function):
+    """Run function and return (result, peak traced MB, seconds)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = function()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 1024 / 1024, seconds
+
+class StreamingPasteboard(FakeSubprocess):
+    """FakeSubprocess whose pbpaste streams `size` bytes from a real child process."""
+
+    def __init__(self, recorder, size):
+        super().__init__(recorder)
+        self.command = [sys.executable, '-c', PASTE_SCRIPT, str(size)]
+
+    def Popen(self, args, **kwargs):
+        if args[0] == 'pbpaste':
+            return subprocess.Popen(self.command, **kwargs)
+        return super().Popen(args, **kwargs)
+
+def unbounded_selection(command):
+    text = subprocess.run(command, capture_output=True, text=True).stdout.strip()
+    return len(SUMMARY_PROMPT.format(text=text))
+
+def unbounded_summary(url, tokens):
+    payload = {"prompt": "summarize", "n_predict": tokens, "stream": True}
+    summary = ""
+    with requests.post(url, data=json.dumps(payload), stream=True) as response:
+        for line in response.iter_lines():
+            if line.startswith(b'data: '):
+                summary += json.loads(line[6:]).get('content', '')
+    return len(summary.strip())
+
+def run_on_stream(tokens):
+    for i in range(tokens):
+        yield f"word{i % 97} "
+
+def report(label, before, after):
+    print(f"{label}")
+    for name, (result, peak, seconds) in (("before", before), ("after", after)):
+        if result is None:
+            print(f"  {name:>6}: skipped")
+            continue
+        print(f"  {name:>6}: peak {peak:8.2f} MB  {seconds:6.2f} s  ({result} characters kept)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--selection-mb', type=float, default=50)
+    parser.add_argument('--tokens', type=int, default=100000, help="tokens in the long responses")
+    parser.add_argument('--token-rate', type=float, default=1e6, help="fake server tokens per second")
+    parser.add_argument('--skip-before', action='store_true', help="only measure the bounded code paths")
+    args = parser.parse_args()
+
+    recorder = SpeechRecorder()
+    install_fakes(recorder)
+    server = serve(token_rate=args.token_rate, slots=2)
+    workdir = tempfile.TemporaryDirectory()
+    repo = os.getcwd()
+    os.chdir(workdir.name)  # assistant.py writes its log to the working directory
+    sys.path.insert(0, repo)
+    logging.disable(logging.INFO)
+    try:
+        import assistant
+        import background_service
+        from speech_pipeline import PipelinedSpeechEngine
+
+        background_service.DEBUG = False
+        background_service.MODEL_WARMUP = False
+        background_service.API_URL = server.url + '/completion'
+        background_service.MAX_TOKENS = args.tokens
+        size = int(args.selection_mb * 1024 * 1024)
+        pasteboard = StreamingPasteboard(recorder, size)
+        background_service.subprocess = pasteboard
+        reader = background_service.TextReader()
+
+        def bounded_selection():
+            text = reader.get_selected_text()
+            fitted = background_service.fit_to_token_budget(
+                text, background_service.MAX_INPUT_TOKENS, background_service.TRUNCATION_STRATEGY)
+            return len(SUMMARY_PROMPT.format(text=fitted))
+
+        skipped = (None, 0.0, 0.0)
+        report(f"{args.selection_mb:g} MB selection -> summary prompt",
+               skipped if args.skip_before else measure(lambda: unbounded_selection(pasteboard.command)),
+               measure(bounded_selection))
+        report(f"{args.tokens} token summary stream",
+               skipped if args.skip_before else measure(lambda: unbounded_summary(background_service.API_URL, args.tokens)),
+               measure(lambda: len(reader.generate_summary("def fib(n): ..."))))
+
+        assistant.PipelinedSpeechEngine = lambda: PipelinedSpeechEngine(
+            synthesize=recorder.synthesize, play=recorder.play, use_processes=False)
+        bot = assistant.ProductivityAssistant()
+
+        def chat():
+            with contextlib.redirect_stdout(io.StringIO()):
+                bot.process_response(run_on_stream(args.tokens))
+            bot.speech_engine.stop()
+            return max(len(text) for _, text in recorder.utterances)
+
+        recorder.reset()
+        report(f"{args.tokens} token run-on chat response (longest utterance)", skipped, measure(chat))
+    finally:
+        os.chdir(repo)
+        workdir.cleanup()
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Token inter-arrival jitter with the productivity monitor in-process versus out-of-process.
+
+A fake token stream is printed at a fixed rate while a fake analyzer does
+GIL-holding work (standing in for screenshot conversion and OCR result
+handling) every --interval seconds, either on a thread in this process or in
+the supervised ProductivityMonitor worker process.
+
+    python -m benchmarks.monitor_jitter --seconds 10 --rate 40 --interval 1
+"""
+import argparse
+import io
+import os
+import queue
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from productivity_monitor import ProductivityMonitor
+
+class BusyAnalyzer:
+    """Fake screen analyzer whose work holds the GIL for one long C call, like image conversion."""
+
+    def __init__(self, size):
+        rng = random.Random(0)
+        self.data = [rng.random() for _ in range(size)]
+
+    def analyze(self):
+        sorted(self.data)
+        return True, ['code']
+
+def make_busy_analyzer(size):
+    return BusyAnalyzer(size)
+
+def stream_tokens(seconds, rate):
+    """Yield (scheduled_time, token) at a steady rate, like a streaming server."""
+    tokens = queue.Queue()
+
+    def produce():
+        start = time.perf_counter()
+        for i in range(int(seconds * rate)):
+            scheduled = start + i / rate
+            time.sleep(max(0.0, scheduled - time.perf_counter()))
+            tokens.put((scheduled, f"token{i} "))
+        tokens.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while (item := tokens.get()) is not None:
+        yield item
+
+def measure(seconds, rate):
+    out = io.StringIO()
+    arrivals = []
+    lateness = []
+    for scheduled, token in stream_tokens(seconds, rate):
+        print(token, end='', flush=True, file=out)
+        now = time.perf_counter()
+        arrivals.append(now)
+        lateness.append(now - scheduled)
+    gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+    lateness.sort()
+    return {
+        'jitter_ms': statistics.pstdev(gaps) * 1000,
+        'max_gap_ms': max(gaps) * 1000,
+        'p99_late_ms': lateness[int(len(lateness) * 0.99)] * 1000,
+    }
+
+def run_in_process(args):
+    analyzer = make_busy_analyzer(args.size)
+    stop = threading.Event()
+
+    def check_loop():
+        while not stop.wait(args.interval):
+            analyzer.analyze()
+
+    threading.Thread(target=check_loop, daemon=True).start()
+    try:
+        return measure(args.seconds, args.rate)
+    finally:
+        stop.set()
+
+def run_out_of_process(args):
+    ready = threading.Event()
+    monitor = ProductivityMonitor(lambda *result: ready.set(), args.interval,
+                                  analyzer_factory=make_busy_analyzer, factory_args=(args.size,))
+    monitor.start()
+    ready.wait(args.interval * 10)  # Let the worker start and report once before measuring
+    try:
+        return measure(args.seconds, args.rate)
+    finally:
+        monitor.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--rate', type=float, default=40, help="tokens per second")
+    parser.add_argument('--interval', type=float, default=1, help="seconds between fake checks")
+    parser.add_argument('--size', type=int, default=2_000_000, help="fake analyzer work size")
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    repo = os.getcwd()
+    os.chdir(workdir.name)  # The worker writes productivity_monitor.log to the working directory
+    sys.path.insert(0, repo)
+    try:
+        for label, run in (("no monitor", lambda a: measure(a.seconds, a.rate)),
+                           ("in-process", run_in_process),
+                           ("out-of-process", run_out_of_process)):
+            result = run(args)
+            print(f"{label:>15}: jitter {result['jitter_ms']:6.1f} ms  max gap {result['max_gap_ms']:6.1f} ms  "
+                  f"p99 lateness {result['p99_late_ms']:6.1f} ms")
+    finally:
+        os.chdir(repo)
+        workdir.cleanup()
+
+if __name__ == "__main__":
+    main()
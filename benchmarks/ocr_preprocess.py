@@ -0,0 +1,153 @@
+"""Capture, preprocessing and OCR keyword-recall benchmark for the productivity check.
+
+Runs headless against labeled fixture screenshots. A fixture directory holds
+images plus a labels.json mapping each file name to the keywords visible in it;
+without --fixtures, synthetic Retina-sized screenshots are rendered instead.
+
+    python -m benchmarks.ocr_preprocess --fixtures path/to/fixtures --repeat 5
+    python -m benchmarks.ocr_preprocess --capture   # also time live capture backends
+    python -m benchmarks.ocr_preprocess --downscale 1 --no-binarize
+
+By default the candidate settings (undo the pixel ratio, binarize) are
+measured rather than the shipped defaults in screen_capture.py, so the recall
+table can justify turning them on.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from screen_capture import CAPTURE_BACKENDS, OcrPreprocessor
+
+KEYWORDS = ['code', 'python', 'project', 'task', 'deadline', 'meeting']
+FILLER = ['the', 'inbox', 'weather', 'video', 'music', 'settings', 'window', 'search', 'news', 'photos']
+
+def render_fixture(keywords, size=(2880, 1800), pixel_ratio=2, dark=False, seed=0):
+    """Render a synthetic screenshot containing the given keywords among filler text."""
+    rng = random.Random(seed)
+    background, foreground = ((30, 30, 36), (220, 220, 220)) if dark else ((250, 250, 250), (40, 40, 40))
+    image = Image.new('RGB', size, background)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=13 * pixel_ratio)
+    line_height = 22 * pixel_ratio
+    words = list(keywords)
+    for y in range(40, size[1] - line_height, line_height):
+        line = ' '.join(rng.choice(FILLER) for _ in range(rng.randint(4, 10)))
+        if words and rng.random() < 0.3:
+            line += ' ' + words.pop()
+        draw.text((40 * pixel_ratio, y), line, fill=foreground, font=font)
+    for word in words:
+        draw.text((40 * pixel_ratio, size[1] - line_height), word, fill=foreground, font=font)
+    # A coloured sidebar, like a real editor or browser
+    draw.rectangle((size[0] - 300 * pixel_ratio, 0, size[0], size[1]), fill=(60, 90, 160))
+    return image
+
+def synthetic_fixtures(count):
+    rng = random.Random(42)
+    fixtures = []
+    for i in range(count):
+        labels = rng.sample(KEYWORDS, rng.randint(1, 3))
+        fixtures.append((f"synthetic_{i}", render_fixture(labels, dark=i % 2 == 1, seed=i), labels, 2))
+    return fixtures
+
+def load_fixtures(directory, pixel_ratio):
+    with open(os.path.join(directory, 'labels.json')) as f:
+        labels = json.load(f)
+    return [(name, Image.open(os.path.join(directory, name)).convert('RGB'), keywords, pixel_ratio)
+            for name, keywords in labels.items()]
+
+def recall(text, labels):
+    text = text.lower()
+    return sum(1 for keyword in labels if keyword in text), len(labels)
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def steady_state_allocation(preprocessor, frame, pixel_ratio):
+    """Peak bytes allocated by one preprocess call once the work buffers exist."""
+    preprocessor.process(frame, 'RGB', pixel_ratio)
+    tracemalloc.start()
+    preprocessor.process(frame, 'RGB', pixel_ratio)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def benchmark_capture(repeat):
+    for name, backend_class in CAPTURE_BACKENDS.items():
+        try:
+            backend = backend_class()
+            frame, seconds = timed(backend.grab, repeat)
+            backend.close()
+            print(f"capture {name:>10}: {frame.shape[1]}x{frame.shape[0]} in {seconds * 1000:.1f} ms")
+        except Exception as e:
+            print(f"capture {name:>10}: unavailable ({e})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', help="directory with screenshots and labels.json")
+    parser.add_argument('--pixel-ratio', type=int, default=2, help="pixel ratio of the fixture screenshots")
+    parser.add_argument('--synthetic', type=int, default=6, help="number of synthetic fixtures to render")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--capture', action='store_true', help="also time live capture backends")
+    parser.add_argument('--no-ocr', action='store_true', help="skip Tesseract, time preprocessing only")
+    parser.add_argument('--downscale', type=int, default=0, help="0 = undo the pixel ratio, 1 = none")
+    parser.add_argument('--no-binarize', dest='binarize', action='store_false')
+    args = parser.parse_args()
+
+    if args.capture:
+        benchmark_capture(args.repeat)
+
+    fixtures = load_fixtures(args.fixtures, args.pixel_ratio) if args.fixtures else synthetic_fixtures(args.synthetic)
+    if not args.no_ocr:
+        try:
+            import pytesseract
+            pytesseract.get_tesseract_version()
+        except (ImportError, OSError) as e:  # pytesseract.TesseractNotFoundError is an OSError
+            print(f"Tesseract is not available ({e}); install it or pass --no-ocr to time preprocessing only")
+            return 1
+
+    preprocessor = OcrPreprocessor(args.downscale, args.binarize)
+    print(f"preprocessing: downscale {args.downscale or 'pixel ratio'}, binarize {args.binarize}")
+    totals = {'raw': [0.0, 0, 0, 0], 'preprocessed': [0.0, 0, 0, 0]}  # ocr seconds, pixels, found, labeled
+    preprocess_seconds = 0.0
+    for name, image, labels, pixel_ratio in fixtures:
+        frame = np.asarray(image)
+        processed, seconds = timed(lambda: preprocessor.process(frame, 'RGB', pixel_ratio).copy(), args.repeat)
+        preprocess_seconds += seconds
+        allocated = steady_state_allocation(preprocessor, frame, pixel_ratio)
+        line = f"{name}: {frame.shape[1]}x{frame.shape[0]} -> {processed.shape[1]}x{processed.shape[0]} " \
+               f"preprocess {seconds * 1000:.1f} ms, allocates {allocated / 1024 / 1024:.2f} MB"
+        if not args.no_ocr:
+            for variant, ocr_input in (('raw', image), ('preprocessed', processed)):
+                text, ocr_seconds = timed(lambda: pytesseract.image_to_string(ocr_input), 1)
+                found, labeled = recall(text, labels)
+                total = totals[variant]
+                total[0] += ocr_seconds
+                total[2] += found
+                total[3] += labeled
+                line += f" | {variant} ocr {ocr_seconds * 1000:.0f} ms recall {found}/{labeled}"
+        totals['raw'][1] += frame.shape[0] * frame.shape[1]
+        totals['preprocessed'][1] += processed.size
+        print(line)
+
+    print(f"\npreprocess total: {preprocess_seconds * 1000:.1f} ms over {len(fixtures)} fixtures, "
+          f"OCR input reduced {totals['raw'][1] / max(1, totals['preprocessed'][1]):.1f}x in pixels "
+          f"({totals['raw'][1] * 3 / max(1, totals['preprocessed'][1]):.1f}x in bytes)")
+    if not args.no_ocr:
+        for variant, (ocr_seconds, _, found, labeled) in totals.items():
+            print(f"{variant:>12}: ocr {ocr_seconds:.2f} s, keyword recall {found}/{labeled} "
+                  f"({found / max(1, labeled):.0%})")
+
+if __name__ == "__main__":
+    sys.exit(main())
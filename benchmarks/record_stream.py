@@ -0,0 +1,44 @@
+"""Record a real llama.cpp token stream, with timing, for replay by the fake server.
+
+    python -m benchmarks.record_stream --prompt "what is AI" -o stream.jsonl
+    python -m benchmarks.fake_server --replay stream.jsonl
+"""
+import argparse
+import json
+import time
+
+import requests
+
+from prompts import ASSISTANT_SYSTEM_PROMPT
+
+def record(api_url, prompt, n_predict, output_path):
+    """Stream a completion and write one {"delay", "content"} line per chunk; return the chunk count."""
+    payload = {"prompt": prompt, "n_predict": n_predict, "stream": True}
+    chunks = 0
+    with requests.post(api_url, json=payload, stream=True) as response, open(output_path, 'w') as output:
+        response.raise_for_status()
+        previous = time.perf_counter()
+        for line in response.iter_lines():
+            if not line.startswith(b'data: '):
+                continue
+            data = json.loads(line[6:])
+            now = time.perf_counter()
+            if data.get('content'):
+                output.write(json.dumps({'delay': round(now - previous, 6), 'content': data['content']}) + '\n')
+                chunks += 1
+            previous = now
+    return chunks
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--api-url', default="http://localhost:8080/completion")
+    parser.add_argument('--prompt', default="what is AI")
+    parser.add_argument('--n-predict', type=int, default=500)
+    parser.add_argument('-o', '--output', default='stream.jsonl')
+    args = parser.parse_args()
+    prompt = f"{ASSISTANT_SYSTEM_PROMPT}<|user|>\n{args.prompt}<|end|>\n<|assistant|>\n"
+    chunks = record(args.api_url, prompt, args.n_predict, args.output)
+    print(f"Recorded {chunks} chunks to {args.output}")
+
+if __name__ == "__main__":
+    main()
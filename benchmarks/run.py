@@ -0,0 +1,255 @@
+"""End-to-end benchmark of the chat, summarize and productivity flows, headless, against a fake server.
+
+Each flow runs the real code in assistant.py, background_service.py and
+productivity_monitor.py with the drivers from benchmarks.drivers standing in
+for speech, keyboard, clipboard and screen. Results are the median of
+--repeat runs and are compared against a saved baseline; the exit status is
+1 if any metric regressed by more than the tolerance. The baseline records the
+conditions it was measured under (fake server settings, real or faked OCR,
+platform), and a metric is only compared when the conditions it depends on
+match; the rest are reported as skipped.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --token-rate 30 --jitter 0.3 --replay stream.jsonl
+    python -m benchmarks.run --save-baseline benchmarks/baselines/default.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.drivers import FakeDisplay, FakeSubprocess, SpeechRecorder, install_fakes, press_hotkey
+from benchmarks.fake_server import load_recording, serve
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'default.json')
+CHAT_PROMPT = "<|user|>\nwhat is AI<|end|>\n<|assistant|>\n"
+SELECTION = "def fib(n):\n    return n if n < 2 else fib(n - 1) + fib(n - 2)\n" * 20
+
+SERVER_CONDITIONS = ('token_rate', 'tokens', 'jitter', 'failure_rate', 'replay')
+
+# metric: (better direction, absolute slack ignored when comparing, conditions that must match the baseline)
+METRICS = {
+    'chat.ttft_s': ('lower', 0.02, SERVER_CONDITIONS),
+    'chat.time_to_first_audio_s': ('lower', 0.05, SERVER_CONDITIONS),
+    'chat.tokens_per_s': ('higher', 1.0, SERVER_CONDITIONS),
+    'summarize.time_to_first_audio_s': ('lower', 0.1, SERVER_CONDITIONS),
+    'summarize.tokens_per_s': ('higher', 1.0, SERVER_CONDITIONS),
+    'productivity.ocr_cpu_s': ('lower', 0.05, ('ocr', 'platform')),
+    'productivity.peak_memory_mb': ('lower', 5.0, ('ocr', 'platform')),
+    'process.max_rss_mb': ('lower', 20.0, ('ocr', 'platform')),
+}
+
+def chat_flow(server, recorder):
+    import assistant
+    from prompts import ASSISTANT_SYSTEM_PROMPT
+    from speech_pipeline import PipelinedSpeechEngine
+
+    assistant.PipelinedSpeechEngine = lambda: PipelinedSpeechEngine(
+        synthesize=recorder.synthesize, play=recorder.play, use_processes=False)
+    bot = assistant.ProductivityAssistant()
+    arrivals = []
+
+    def timed(stream):
+        for chunk in stream:
+            arrivals.append(time.perf_counter())
+            yield chunk
+
+    recorder.reset()
+    start = time.perf_counter()
+    stream = bot.generate_text_stream(ASSISTANT_SYSTEM_PROMPT + CHAT_PROMPT, api_url=server.url + '/completion')
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot.process_response(timed(stream))
+    bot.speech_engine.stop()
+    first_audio = recorder.first_after(start)
+    streaming = arrivals[-1] - arrivals[0] if len(arrivals) > 1 else 0.0
+    return {
+        'chat.ttft_s': arrivals[0] - start if arrivals else float('nan'),
+        'chat.time_to_first_audio_s': first_audio - start if first_audio else float('nan'),
+        'chat.tokens_per_s': (len(arrivals) - 1) / streaming if streaming else 0.0,
+    }
+
+def summarize_flow(server, recorder):
+    import background_service
+
+    background_service.DEBUG = False
+    background_service.MODEL_WARMUP = False
+    background_service.API_URL = server.url + '/completion'
+    background_service.subprocess = FakeSubprocess(recorder, clipboard=SELECTION)
+    reader = background_service.TextReader()
+    summaries = []
+    original = reader.generate_summary
+    reader.generate_summary = lambda text: summaries.append(original(text)) or summaries[-1]
+
+    recorder.reset()
+    start = time.perf_counter()
+    press_hotkey(reader, 's')
+    first_audio = recorder.first_after(start)
+    elapsed = first_audio - start if first_audio else float('nan')
+    tokens = len(summaries[0].split()) if summaries else 0  # Fake server tokens are single words
+    return {
+        'summarize.time_to_first_audio_s': elapsed,
+        'summarize.tokens_per_s': tokens / elapsed if elapsed else 0.0,
+    }
+
+def productivity_flow():
+    import productivity_monitor
+
+    analyzer = productivity_monitor.ScreenAnalyzer()  # Captures the fake display through the mss backend
+    cpu_start = time.process_time()
+    children_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+    tracemalloc.start()
+    is_work_related, _ = analyzer.analyze()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    child_cpu = (children.ru_utime - children_start.ru_utime) + (children.ru_stime - children_start.ru_stime)
+    return {
+        'productivity.ocr_cpu_s': time.process_time() - cpu_start + child_cpu,  # Tesseract runs as a child
+        'productivity.peak_memory_mb': peak / 1024 / 1024,
+        'productivity.detected': float(is_work_related),
+    }
+
+def max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024  # bytes on macOS, KiB on Linux
+
+def run_conditions(args, ocr_text):
+    """The settings a result depends on, saved with the baseline."""
+    return {
+        'token_rate': args.token_rate,
+        'tokens': args.tokens,
+        'jitter': args.jitter,
+        'failure_rate': args.failure_rate,
+        'replay': os.path.basename(args.replay) if args.replay else None,
+        'ocr': 'faked' if ocr_text is not None else 'tesseract',
+        'platform': f"{sys.platform}-{platform.machine()}",
+    }
+
+def compare(results, conditions, baseline, tolerance):
+    """Return (regressions, skipped, compared) against a baseline saved by --save-baseline.
+
+    regressions lists (metric, baseline, result) for metrics that got worse
+    beyond tolerance; skipped lists (metric, [differing conditions]) for
+    metrics whose run conditions do not match the baseline's; compared counts
+    the metrics actually checked.
+    """
+    baseline_conditions = baseline.get('conditions', {})
+    baseline_metrics = baseline.get('metrics', {})
+    regressions = []
+    skipped = []
+    compared = 0
+    for metric, (better, slack, depends_on) in METRICS.items():
+        if metric not in results or metric not in baseline_metrics:
+            continue
+        differing = [name for name in depends_on if baseline_conditions.get(name) != conditions[name]]
+        if differing:
+            skipped.append((metric, differing))
+            continue
+        compared += 1
+        old, new = baseline_metrics[metric], results[metric]
+        allowed = abs(old) * tolerance + slack
+        if (better == 'lower' and new > old + allowed) or (better == 'higher' and new < old - allowed):
+            regressions.append((metric, old, new))
+    return regressions, skipped, compared
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flows', nargs='+', choices=['chat', 'summarize', 'productivity'],
+                        default=['chat', 'summarize', 'productivity'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--token-rate', type=float, default=50)
+    parser.add_argument('--tokens', type=int, default=120, help="tokens per fake response")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--replay', help="replay a stream recorded with benchmarks.record_stream")
+    parser.add_argument('--ocr-text', help="skip Tesseract and pretend OCR returned this text")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', metavar='PATH', help="write these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument('--json', metavar='PATH', help="also write results to this file")
+    args = parser.parse_args()
+
+    recorder = SpeechRecorder()
+    ocr_text = args.ocr_text
+    if ocr_text is None and shutil.which('tesseract') is None:
+        ocr_text = "code project"  # What Tesseract reads from the rendered fixture
+    display = FakeDisplay()
+    faked = install_fakes(recorder, ocr_text, display)
+    print(f"Fake drivers: {', '.join(faked)}" + (" (OCR faked)" if ocr_text is not None else ""))
+    server = serve(token_rate=args.token_rate, default_tokens=args.tokens, max_tokens=args.tokens, jitter=args.jitter,
+                   failure_rate=args.failure_rate, replay=load_recording(args.replay) if args.replay else None)
+
+    workdir = tempfile.TemporaryDirectory()
+    repo = os.getcwd()
+    os.chdir(workdir.name)  # The scripts write logs and the activity timeline to the working directory
+    sys.path.insert(0, repo)
+    logging.disable(logging.INFO)  # assistant.py logs at DEBUG; keep that out of the timings
+    runs = []
+    try:
+        if 'productivity' in args.flows:
+            from benchmarks.ocr_preprocess import render_fixture
+            display.show(render_fixture(['code', 'project']))
+        for _ in range(args.repeat):
+            results = {}
+            with contextlib.redirect_stderr(io.StringIO()):
+                if 'chat' in args.flows:
+                    results.update(chat_flow(server, recorder))
+                if 'summarize' in args.flows:
+                    results.update(summarize_flow(server, recorder))
+                if 'productivity' in args.flows:
+                    results.update(productivity_flow())
+            runs.append(results)
+    finally:
+        os.chdir(repo)
+        workdir.cleanup()
+        server.stop()
+
+    results = {metric: statistics.median(run[metric] for run in runs) for metric in runs[0]}
+    results['process.max_rss_mb'] = max_rss_mb()
+    results['server.failures'] = server.failures
+
+    conditions = run_conditions(args, ocr_text)
+    for metric, value in results.items():
+        print(f"{metric:<36}{value:>12.3f}")
+    report = {'conditions': conditions, 'metrics': results}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if 'conditions' not in baseline:
+        print(f"\n{args.baseline} does not record its run conditions; re-create it with --save-baseline")
+        return 0
+    regressions, skipped, compared = compare(results, conditions, baseline, args.tolerance)
+    for metric, differing in skipped:
+        details = ', '.join(f"{name} {baseline['conditions'].get(name)!r} -> {conditions[name]!r}"
+                            for name in differing)
+        print(f"SKIPPED {metric}: run conditions differ from the baseline ({details})")
+    for metric, old, new in regressions:
+        print(f"REGRESSION {metric}: {old:.3f} -> {new:.3f}")
+    if not regressions:
+        print(f"\nNo regressions in {compared} compared metrics against {args.baseline} "
+              f"(tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
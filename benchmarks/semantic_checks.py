@@ -0,0 +1,107 @@
+"""Latency and cache hit rate of SemanticClassifier over a simulated day of screen checks.
+
+Uses the offline hashing embedder by default; pass --url to embed through a
+running llama.cpp server instead. Also reports how many texts are embedded
+again when one exemplar is added and when the classifier restarts.
+
+    python -m benchmarks.semantic_checks --exemplars 5000 --checks 200
+    python -m benchmarks.semantic_checks --url http://localhost:8080/embedding
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from semantic_classifier import HashingEmbedder, LlamaEmbedder, SemanticClassifier
+
+WORK_WORDS = ['refactor', 'function', 'pull request', 'unit test', 'stack trace', 'sprint', 'spreadsheet',
+              'quarterly report', 'compiler', 'database', 'invoice', 'roadmap', 'terminal', 'review']
+NON_WORK_WORDS = ['recipe', 'trailer', 'playlist', 'highlights', 'celebrity', 'vacation', 'memes',
+                  'shopping cart', 'game', 'episode', 'sneakers', 'horoscope', 'livestream', 'forum']
+
+class CountingEmbedder:
+    """Wraps an embedder, counting requests and texts sent to it."""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.identity = embedder.identity
+        self.requests = 0
+        self.texts = 0
+
+    def embed(self, texts):
+        self.requests += 1
+        self.texts += len(texts)
+        return self.embedder.embed(texts)
+
+    def take(self):
+        counts = (self.texts, self.requests)
+        self.requests = self.texts = 0
+        return counts
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(words) for _ in range(rng.randint(5, 12)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--exemplars', type=int, default=5000, help="exemplars per class")
+    parser.add_argument('--checks', type=int, default=200)
+    parser.add_argument('--distinct-screens', type=int, default=20,
+                        help="screens repeat, as they do between 5-minute checks")
+    parser.add_argument('--url', help="llama.cpp /embedding endpoint to use instead of the stub")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    embedder = CountingEmbedder(LlamaEmbedder(args.url) if args.url else HashingEmbedder())
+    workdir = tempfile.TemporaryDirectory()
+    exemplars_file = os.path.join(workdir.name, 'exemplars.json')
+    exemplars = {'work': [sentence(rng, WORK_WORDS) for _ in range(args.exemplars)],
+                 'non_work': [sentence(rng, NON_WORK_WORDS) for _ in range(args.exemplars)]}
+    with open(exemplars_file, 'w') as f:
+        json.dump(exemplars, f)
+    classifier = SemanticClassifier(embedder, exemplars_file=exemplars_file)
+
+    start = time.perf_counter()
+    classifier.load_exemplars()
+    texts, requests = embedder.take()
+    print(f"embedded {2 * args.exemplars} exemplars in {time.perf_counter() - start:.2f} s "
+          f"({texts} texts, {requests} requests)")
+
+    screens = [(sentence(rng, WORK_WORDS), True) if i % 2 == 0 else (sentence(rng, NON_WORK_WORDS), False)
+               for i in range(args.distinct_screens)]
+    correct = 0
+    latencies = []
+    for _ in range(args.checks):
+        text, expected = rng.choice(screens)
+        start = time.perf_counter()
+        is_work_related, _, _ = classifier.classify(text)
+        latencies.append(time.perf_counter() - start)
+        correct += is_work_related == expected
+
+    embedder.take()
+    exemplars['work'].append(sentence(rng, WORK_WORDS))
+    with open(exemplars_file, 'w') as f:
+        json.dump(exemplars, f)
+    os.utime(exemplars_file, (time.time() + 1, time.time() + 1))  # Make sure the mtime changes
+    start = time.perf_counter()
+    classifier.classify(screens[0][0])
+    texts, requests = embedder.take()
+    print(f"check after adding one exemplar: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"embedded {texts} texts in {requests} requests")
+    start = time.perf_counter()
+    SemanticClassifier(embedder, exemplars_file=exemplars_file).load_exemplars()
+    texts, requests = embedder.take()
+    print(f"restart: exemplars ready in {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"embedded {texts} texts in {requests} requests")
+    workdir.cleanup()
+
+    latencies.sort()
+    stats = classifier.stats()
+    print(f"{args.checks} checks: mean {stats['mean_latency'] * 1000:.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+    print(f"cache hit rate {stats['cache_hit_rate']:.0%} ({stats['cache_hits']} hits, {stats['cache_misses']} misses)")
+    print(f"accuracy {correct / args.checks:.0%}")
+
+if __name__ == "__main__":
+    main()
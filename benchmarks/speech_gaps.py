@@ -0,0 +1,48 @@
+"""Inter-utterance gap benchmark for PipelinedSpeechEngine using a fake synthesizer.
+
+Compares serial synthesis (lookahead 0, the ThreadSafeSpeechEngine behaviour)
+with pipelined synthesis ahead of playback:
+
+    python -m benchmarks.speech_gaps --sentences 20 --lookahead 3
+"""
+import argparse
+import time
+
+from speech_pipeline import PipelinedSpeechEngine
+
+SENTENCE = "Artificial intelligence is the study of systems that perceive, reason and act."
+
+def fake_synthesize(text, properties, seconds_per_char=0.002):
+    """Pretend to synthesize: cost grows with text length, like a real TTS engine."""
+    time.sleep(len(text) * seconds_per_char)
+    return len(text) / (properties.get('rate', 200) * 6 / 60)  # Audio duration in seconds
+
+def fake_play(duration, speedup=10.0):
+    """Pretend to play audio, compressed in time so the benchmark finishes quickly."""
+    time.sleep(duration / speedup)
+
+def run(sentences, lookahead, workers):
+    engine = PipelinedSpeechEngine(synthesize=fake_synthesize, play=fake_play,
+                                   workers=workers, lookahead=lookahead, use_processes=False)
+    engine.set_property('rate', 300)
+    start = time.perf_counter()
+    for _ in range(sentences):
+        engine.say(SENTENCE)
+    engine.stop()
+    return engine.metrics.summary(), time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sentences', type=int, default=20)
+    parser.add_argument('--lookahead', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    for label, lookahead in (("serial", 0), ("pipelined", args.lookahead)):
+        gaps, elapsed = run(args.sentences, lookahead, args.workers)
+        print(f"{label:>10}: lookahead={lookahead} utterances={gaps['utterances']} "
+              f"mean_gap={gaps['mean_gap'] * 1000:.1f}ms p95_gap={gaps['p95_gap'] * 1000:.1f}ms "
+              f"max_gap={gaps['max_gap'] * 1000:.1f}ms total={elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
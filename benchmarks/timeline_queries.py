@@ -0,0 +1,64 @@
+"""Query latency and memory benchmark for ActivityTimeline on synthetic year-long timelines.
+
+    python -m benchmarks.timeline_queries --days 365 --interval 300
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from activity_timeline import ActivityTimeline, RECORD
+
+TERMS = ['code', 'python', 'project', 'task', 'deadline', 'meeting']
+
+def synthetic_checks(days, interval, seed=0):
+    """Yield checks during working hours with bursts of distraction."""
+    rng = random.Random(seed)
+    start = time.time() - days * 86400
+    distracted = False
+    for step in range(int(days * 86400 / interval)):
+        timestamp = start + step * interval
+        if not 8 <= time.localtime(timestamp).tm_hour < 19:
+            continue
+        if rng.random() < (0.3 if distracted else 0.08):
+            distracted = not distracted
+        terms = [] if distracted else rng.sample(TERMS, rng.randint(1, 3))
+        yield timestamp, not distracted, terms
+
+def measure(label, query):
+    start = time.perf_counter()
+    result = query()
+    elapsed = time.perf_counter() - start
+    # Measure memory in a second run; tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    query()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32}{elapsed * 1000:>9.1f} ms  peak {peak / 1024:>7.1f} KiB  ({result})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--interval', type=int, default=300, help="seconds between checks")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        timeline = ActivityTimeline(os.path.join(directory, 'timeline.bin'))
+        start = time.perf_counter()
+        timeline.extend(synthetic_checks(args.days, args.interval))
+        size = os.path.getsize(timeline.path)
+        print(f"wrote {len(timeline)} checks ({RECORD.size} bytes each, {size / 1024 / 1024:.1f} MiB) "
+              f"in {time.perf_counter() - start:.2f} s\n")
+
+        now = time.time()
+        measure("daily report, last 30 days", lambda: f"{len(timeline.aggregate('day', now - 30 * 86400))} rows")
+        measure("daily report, last 90 days", lambda: f"{len(timeline.aggregate('day', now - 90 * 86400))} rows")
+        measure("hourly report, last 7 days", lambda: f"{len(timeline.aggregate('hour', now - 7 * 86400))} rows")
+        measure("daily report, full year", lambda: f"{len(timeline.aggregate('day'))} rows")
+        measure("distraction streaks, 90 days",
+                lambda: f"{sum(1 for _ in timeline.distraction_streaks(now - 90 * 86400, min_checks=3))} streaks")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""First-request versus steady-state time to first token, with and without model warm-up.
+
+The fake server charges a cold-start cost on first use and after --evict-after
+idle seconds, plus prompt evaluation for tokens missing from its prompt cache.
+The multi-turn case builds up a conversation history and checks that the
+keep-alives sent while idle leave it cached for the next turn.
+
+    python -m benchmarks.warmup_ttft --cold-start 2 --evict-after 3 --idle 5
+"""
+import argparse
+import json
+import time
+
+import requests
+
+from benchmarks.fake_server import serve
+from model_warmup import ModelWarmer
+from prompts import ASSISTANT_SYSTEM_PROMPT
+
+def time_to_first_token(url, prompt):
+    payload = {"prompt": prompt, "n_predict": 8, "stream": True, "cache_prompt": True}
+    start = time.perf_counter()
+    with requests.post(url, json=payload, stream=True) as response:
+        for line in response.iter_lines():
+            if line.startswith(b'data: ') and json.loads(line[6:]).get('content'):
+                return time.perf_counter() - start
+    return time.perf_counter() - start
+
+def run(args, warm_up, keep_alive):
+    server = serve(token_rate=100, slots=1, cold_start=args.cold_start,
+                   evict_after=args.evict_after, prompt_rate=args.prompt_rate)
+    url = server.url + '/completion'
+    system_prompt = ASSISTANT_SYSTEM_PROMPT * args.system_repeat
+    warmer = ModelWarmer(url, [system_prompt], interval=args.keep_alive_interval if keep_alive else 0)
+    try:
+        if warm_up:
+            warmer.start()  # Warms up in the background while the user types
+        time.sleep(args.startup)
+        prompt = system_prompt + "<|user|>\nwhat is AI<|end|>\n<|assistant|>\n"
+        first = time_to_first_token(url, prompt)
+        warmer.touch()
+        steady = time_to_first_token(url, prompt + "AI is...<|end|>\n<|user|>\nmore<|end|>\n<|assistant|>\n")
+        warmer.touch()
+        time.sleep(args.idle)
+        after_idle = time_to_first_token(url, prompt + "<|user|>\nand now?<|end|>\n<|assistant|>\n")
+        return first, steady, after_idle
+    finally:
+        warmer.stop()
+        server.stop()
+
+def multi_turn(args, keep_conversation):
+    """Return (steady TTFT, TTFT after idle) for a long conversation, keep-alives on throughout."""
+    server = serve(token_rate=100, slots=1, cold_start=args.cold_start,
+                   evict_after=args.evict_after, prompt_rate=args.prompt_rate)
+    url = server.url + '/completion'
+    warmer = ModelWarmer(url, [ASSISTANT_SYSTEM_PROMPT], interval=args.keep_alive_interval)
+    try:
+        warmer.warm_up()
+        prompt = ASSISTANT_SYSTEM_PROMPT
+        ttfts = []
+        for turn in range(args.turns + 1):
+            if turn == args.turns:
+                time.sleep(args.idle)
+            prompt += f"<|user|>\nquestion {turn} " + "with some context " * 8 + "<|end|>\n<|assistant|>\n"
+            # Passing no prompt makes keep-alives re-send only the system prompt, as before
+            warmer.touch(prompt if keep_conversation else None)
+            ttfts.append(time_to_first_token(url, prompt))
+            if turn == 0:
+                warmer.start(warm_up=False)
+            prompt += "answer " * 10 + "<|end|>\n"
+        return ttfts[-2], ttfts[-1]
+    finally:
+        warmer.stop()
+        server.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cold-start', type=float, default=2.0, help="seconds to load the model")
+    parser.add_argument('--evict-after', type=float, default=3.0, help="idle seconds before eviction")
+    parser.add_argument('--prompt-rate', type=float, default=200, help="prompt tokens per second")
+    parser.add_argument('--system-repeat', type=int, default=40, help="inflate the system prompt to model a long one")
+    parser.add_argument('--startup', type=float, default=5.0, help="seconds before the first prompt")
+    parser.add_argument('--idle', type=float, default=5.0, help="idle seconds before the last prompt")
+    parser.add_argument('--keep-alive-interval', type=float, default=1.0)
+    parser.add_argument('--turns', type=int, default=6, help="conversation turns before the idle period")
+    args = parser.parse_args()
+
+    for label, warm_up, keep_alive in (("cold", False, False), ("warm-up", True, False),
+                                       ("warm-up + keep-alive", True, True)):
+        first, steady, after_idle = run(args, warm_up, keep_alive)
+        print(f"{label:>21}: first TTFT {first * 1000:7.0f} ms  steady {steady * 1000:6.0f} ms  "
+              f"after {args.idle:.0f} s idle {after_idle * 1000:7.0f} ms")
+
+    print(f"\n{args.turns}-turn conversation, keep-alives every {args.keep_alive_interval:g} s while idle:")
+    for label, keep_conversation in (("system-prompt keep-alive", False), ("last-prompt keep-alive", True)):
+        steady, after_idle = multi_turn(args, keep_conversation)
+        print(f"{label:>25}: steady {steady * 1000:6.0f} ms  after {args.idle:.0f} s idle {after_idle * 1000:7.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Helpers for keeping huge clipboard selections and runaway responses in bounded memory."""
+import hashlib
+import re
+import subprocess
+from collections import deque
+
+# Constants
+MAX_SELECTION_BYTES = 2 * 1024 * 1024  # Bytes of a selection kept in memory; the rest is only hashed
+READ_CHUNK_BYTES = 64 * 1024
+CHARS_PER_TOKEN = 4  # Rough average for English text and code
+SAMPLE_WINDOWS = 8
+SENTENCE_END = re.compile(r'[.!?](?=\s|$)')  # Not the dot in "3.14" or "os.path"
+
+class CapturedText:
+    """Result of capture_command: kept text plus facts about the whole input."""
+
+    def __init__(self, text, sha256, total_bytes, truncated):
+        self.text = text
+        self.sha256 = sha256
+        self.total_bytes = total_bytes
+        self.truncated = truncated
+
+def capture_command(args, max_bytes=MAX_SELECTION_BYTES, chunk_bytes=READ_CHUNK_BYTES, subprocess_module=subprocess):
+    """Run a command and stream its stdout, keeping at most `max_bytes` of it.
+
+    The first three quarters of the budget go to the start of the output and
+    the rest to a rolling window over its end, so both ends of an oversized
+    selection survive. The whole output is hashed as it streams past.
+    """
+    tail_bytes = max_bytes // 4
+    head = bytearray()
+    tail = deque()
+    tail_size = 0
+    total = 0
+    hasher = hashlib.sha256()
+    process = subprocess_module.Popen(args, stdout=subprocess_module.PIPE)
+    try:
+        while True:
+            chunk = process.stdout.read(chunk_bytes)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            total += len(chunk)
+            room = max_bytes - tail_bytes - len(head)
+            if room > 0:
+                head += chunk[:room]
+                chunk = chunk[room:]
+            if chunk and tail_bytes:
+                tail.append(chunk)
+                tail_size += len(chunk)
+                while tail_size - len(tail[0]) >= tail_bytes:
+                    tail_size -= len(tail.popleft())
+    finally:
+        process.stdout.close()
+        process.wait()
+
+    truncated = total > max_bytes
+    tail_data = b''.join(tail)
+    if truncated:
+        tail_data = tail_data[-tail_bytes:]
+    text = head.decode('utf-8', errors='ignore')
+    if tail_data:
+        if truncated:
+            text += f"\n[... {total - len(head) - len(tail_data)} bytes omitted ...]\n"
+        text += tail_data.decode('utf-8', errors='ignore')
+    return CapturedText(text, hasher.hexdigest(), total, truncated)
+
+def fit_to_token_budget(text, max_tokens, strategy='head_tail', chars_per_token=CHARS_PER_TOKEN):
+    """Shorten text to roughly `max_tokens` tokens.
+
+    'head_tail' keeps the beginning and end, where code and documents usually
+    say what they are. 'sample' keeps evenly spaced windows so the summary
+    sees the whole document's structure.
+    """
+    budget = max_tokens * chars_per_token
+    if len(text) <= budget:
+        return text
+    omitted = len(text) - budget
+    if strategy == 'head_tail':
+        head = budget * 2 // 3
+        tail = budget - head
+        return f"{text[:head]}\n[... {omitted} characters omitted ...]\n{text[len(text) - tail:]}"
+    if strategy == 'sample':
+        window = budget // SAMPLE_WINDOWS
+        # Spread the window starts so the last window ends exactly at the end of the text
+        stride = (len(text) - window) // (SAMPLE_WINDOWS - 1)
+        starts = [i * stride for i in range(SAMPLE_WINDOWS - 1)] + [len(text) - window]
+        windows = [text[start:start + window] for start in starts]
+        return f"\n[... {omitted // (SAMPLE_WINDOWS - 1)} characters omitted ...]\n".join(windows)
+    raise ValueError(f"Unknown truncation strategy: {strategy}")
+
+class TextBuffer:
+    """Accumulates streamed text up to `max_chars`, keeping the start.
+
+    For text that will be spoken: once full, callers should stop reading the
+    stream, and text() ends at the last sentence (or word) boundary so speech
+    does not stop mid-sentence.
+    """
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.chunks = []
+        self.size = 0
+        self.truncated = False
+
+    @property
+    def full(self):
+        return self.size >= self.max_chars
+
+    def append(self, chunk):
+        """Add a chunk, dropping whatever does not fit; returns False once the buffer is full."""
+        room = self.max_chars - self.size
+        if len(chunk) >= room:
+            chunk = chunk[:room]
+            self.truncated = True  # Callers stop reading here, so anything after is lost
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        return not self.full
+
+    def text(self):
+        text = ''.join(self.chunks)
+        if self.truncated:
+            ends = [match.start() for match in SENTENCE_END.finditer(text)]
+            end = ends[-1] if ends else -1
+            if end <= 0:
+                end = text.rfind(' ')
+            if end > 0:
+                text = text[:end + 1]
+        return text
+
+    def __len__(self):
+        return self.size
@@ -6,6 +6,8 @@ import requests
 import json
 import os
 from dotenv import load_dotenv
+from prompts import OPENAI_SUMMARY_SYSTEM_PROMPT
+from bounded_text import MAX_SELECTION_BYTES, capture_command, fit_to_token_budget
 
 # Load environment variables for API key
 load_dotenv()
@@ -15,6 +17,8 @@ DEBUG = True
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 API_URL = "https://api.openai.com/v1/chat/completions"
 MODEL_NAME = "gpt-4o-mini"  # Updated model name
+MAX_INPUT_TOKENS = 16000  # Selections longer than this are cut down before they are sent
+TRUNCATION_STRATEGY = 'head_tail'  # 'head_tail' or 'sample'
 
 def log(message):
     """Print debug messages if DEBUG is True"""
@@ -49,28 +53,11 @@ class TextReader:
     "messages": [
         {
             "role": "system",
-            "content": """You are an expert analyst and educator who provides clear, insightful explanations. Follow these guidelines:
-
-For Code:
-- First briefly state what the code does in one sentence
-- Explain the key components and their interactions
-- Highlight important functions, patterns, or algorithms used
-- Point out any notable optimizations or potential issues
-- If there are any best practices or design patterns, mention them
-- Keep explanations technical but accessible
-
-For Text:
-- Provide a clear, concise summary of the main points
-- Identify key themes, arguments, or concepts
-- Highlight any important relationships or implications
-- Extract actionable insights or conclusions
-- Maintain the original tone and context
-
-Always prioritize clarity and precision. If the content contains errors or potential improvements, note them briefly. Format complex information in a structured way."""
+            "content": OPENAI_SUMMARY_SYSTEM_PROMPT
         },
         {
             "role": "user",
-            "content": text
+            "content": fit_to_token_budget(text, MAX_INPUT_TOKENS, TRUNCATION_STRATEGY)
         }
     ],
     "temperature": 0.3,
@@ -134,11 +121,13 @@ Always prioritize clarity and precision. If the content contains errors or poten
                 kb.tap('c')
             time.sleep(0.1)
             
-            result = subprocess.run(['pbpaste'], capture_output=True, text=True)
-            text = result.stdout.strip()
+            captured = capture_command(['pbpaste'], MAX_SELECTION_BYTES, subprocess_module=subprocess)
+            text = captured.text.strip()
             
             if text:
-                log(f"Selected text: {text[:100]}...")
+                log(f"Selected {captured.total_bytes} bytes (sha256 {captured.sha256[:12]}): {text[:100]}...")
+                if captured.truncated:
+                    log(f"Selection larger than {MAX_SELECTION_BYTES} bytes; kept its start and end")
                 return text
             else:
                 log("No text selected")
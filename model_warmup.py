@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Constants
+KEEP_ALIVE_INTERVAL = 240  # Seconds between keep-alives while idle (0 = never)
+KEEP_ALIVE_MAX_IDLE = 3600  # Stop keeping the model warm after this long without use (0 = forever)
+WARMUP_TIMEOUT = 300  # The first request may have to wait for the model to load
+
+class ModelWarmer:
+    """Pre-evaluates fixed prompt prefixes on the llama.cpp server and keeps them warm.
+
+    warm_up() sends each prefix with n_predict 0 and cache_prompt, so the server
+    loads the model and fills a slot's KV cache before the first real request.
+    While idle, a cached prompt is re-sent every `interval` seconds; it hits
+    the cache and costs almost nothing, but stops the model from being paged
+    out. After `max_idle` seconds without real use the keep-alives pause until
+    touch() is called again.
+
+    Keep-alives re-send the last real prompt passed to touch(), not the bare
+    prefixes. The server routes a request to the slot whose cache matches it
+    best, and a bare prefix would match the live conversation's slot and
+    truncate its cache to the prefix, throwing away the cached history.
+    """
+
+    def __init__(self, api_url, prefixes, slot=None, interval=KEEP_ALIVE_INTERVAL, max_idle=KEEP_ALIVE_MAX_IDLE):
+        self.api_url = api_url
+        self.prefixes = list(prefixes)
+        self.slot = slot
+        self.interval = interval
+        self.max_idle = max_idle
+        self.session = requests.Session()
+        self.last_activity = time.monotonic()
+        self.last_request = 0.0
+        self.last_prompt = None
+        self.stop_event = threading.Event()
+        self.keep_alive_thread = None
+
+    def evaluate_prefixes(self, timeout, prompts=None):
+        for prompt in prompts or self.prefixes:
+            payload = {"prompt": prompt, "n_predict": 0, "cache_prompt": True}
+            if self.slot is not None:
+                payload["id_slot"] = self.slot
+            response = self.session.post(self.api_url, json=payload, timeout=timeout)
+            response.raise_for_status()
+        self.last_request = time.monotonic()
+
+    def warm_up(self):
+        """Load the model and cache the prefixes; returns True on success."""
+        start = time.perf_counter()
+        try:
+            self.evaluate_prefixes(WARMUP_TIMEOUT)
+            logger.info(f"Model warm-up finished in {time.perf_counter() - start:.2f} s")
+            return True
+        except requests.RequestException as e:
+            logger.warning(f"Model warm-up failed: {e}")
+            return False
+
+    def touch(self, prompt=None):
+        """Record real use of the model, which also resets the keep-alive schedule.
+
+        Pass the prompt being sent so keep-alives re-send it and leave its
+        cached tokens in place.
+        """
+        now = time.monotonic()
+        self.last_activity = now
+        self.last_request = now
+        if prompt is not None:
+            self.last_prompt = prompt
+
+    def keep_alive(self):
+        while not self.stop_event.wait(min(self.interval, 30)):
+            now = time.monotonic()
+            if now - self.last_request < self.interval:
+                continue
+            if self.max_idle and now - self.last_activity > self.max_idle:
+                continue
+            try:
+                self.evaluate_prefixes(60, [self.last_prompt] if self.last_prompt else None)
+                logger.debug("Sent model keep-alive")
+            except requests.RequestException as e:
+                logger.warning(f"Model keep-alive failed: {e}")
+                self.last_request = now  # Retry on the next interval, not on every wake-up
+
+    def start(self, warm_up=True):
+        """Warm up in the background and keep the model warm until stop()."""
+        def run():
+            if warm_up:
+                self.warm_up()
+            if self.interval:
+                self.keep_alive()
+
+        self.keep_alive_thread = threading.Thread(target=run, name="ModelKeepAlive", daemon=True)
+        self.keep_alive_thread.start()
+
+    def stop(self):
+        self.stop_event.set()
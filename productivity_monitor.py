@@ -0,0 +1,209 @@
+import logging
+from logging.handlers import RotatingFileHandler
+import multiprocessing
+import os
+import subprocess
+import threading
+import time
+
+import pytesseract
+
+from screen_capture import create_capture_backend, OcrPreprocessor
+
+logger = logging.getLogger(__name__)
+
+# Constants
+WORK_RELATED_KEYWORDS = ['code', 'python', 'project', 'task', 'deadline', 'meeting']
+MONITOR_LOG_FILE = 'productivity_monitor.log'
+RESTART_BACKOFF_MAX = 60  # Seconds between restarts of a crashing worker, at most
+HANG_FACTOR = 3  # Restart a worker that has been silent for this many check intervals
+
+class TesseractNotFoundError(Exception):
+    """Custom exception for when Tesseract is not found."""
+    pass
+
+def find_tesseract_mac():
+    """Find Tesseract executable on macOS."""
+    logger.info("Searching for Tesseract executable")
+    common_paths = [
+        '/opt/homebrew/bin/tesseract',
+        '/usr/local/bin/tesseract',
+    ]
+
+    for path in common_paths:
+        if os.path.isfile(path):
+            logger.info(f"Tesseract found at: {path}")
+            return path
+
+    try:
+        path = subprocess.check_output(['which', 'tesseract']).decode().strip()
+        logger.info(f"Tesseract found at: {path}")
+        return path
+    except subprocess.CalledProcessError:
+        logger.error("Tesseract not found in system PATH")
+        return None
+
+def setup_tesseract():
+    """Set up Tesseract OCR."""
+    tesseract_cmd = find_tesseract_mac()
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        logger.info(f"Tesseract set up successfully at: {tesseract_cmd}")
+    else:
+        logger.error("Tesseract executable not found")
+        raise TesseractNotFoundError("Tesseract executable not found. Please install Tesseract OCR using Homebrew.")
+
+class ScreenAnalyzer:
+    """Capture the screen, OCR it, and decide whether the content is work-related."""
+
+    def __init__(self, semantic_classifier=None):
+        self.screen_capture = None
+        self.ocr_preprocessor = OcrPreprocessor()
+        self.semantic_classifier = semantic_classifier
+
+    def analyze(self):
+        """Take a screenshot, perform OCR, and check if the content is work-related.
+
+        Returns (is_work_related, matched_keywords); matched_keywords is None if the check failed.
+        """
+        logger.info("Taking screenshot for productivity analysis")
+        if self.screen_capture is None:
+            self.screen_capture = create_capture_backend()
+
+        try:
+            start = time.perf_counter()
+            frame = self.screen_capture.grab()
+            captured = time.perf_counter()
+            image = self.ocr_preprocessor.process(frame, self.screen_capture.channels, self.screen_capture.pixel_ratio)
+            logger.debug(f"Captured {frame.shape[1]}x{frame.shape[0]} in {(captured - start) * 1000:.1f} ms, "
+                         f"preprocessed to {image.shape[1]}x{image.shape[0]} in {(time.perf_counter() - captured) * 1000:.1f} ms")
+            text = pytesseract.image_to_string(image)
+            logger.debug(f"OCR extracted text: {text[:100]}...")  # Log first 100 chars
+
+            lowered = text.lower()
+            matched_keywords = [keyword for keyword in WORK_RELATED_KEYWORDS if keyword in lowered]
+            is_work_related = bool(matched_keywords)
+            if not is_work_related and self.semantic_classifier:
+                try:
+                    is_work_related, _, _ = self.semantic_classifier.classify(text)
+                    if is_work_related:
+                        matched_keywords.append('semantic')
+                except Exception as e:
+                    logger.error(f"Semantic classification failed: {e}")
+
+            logger.info(f"Screenshot analysis result: work-related = {is_work_related}, matched = {matched_keywords}")
+            return is_work_related, matched_keywords
+        except Exception as e:
+            logger.error(f"Error in OCR processing: {e}")
+            return True, None  # Assume work-related in case of errors
+
+def create_screen_analyzer(semantic=False):
+    """Build a ScreenAnalyzer with Tesseract configured for the current process."""
+    setup_tesseract()
+    semantic_classifier = None
+    if semantic:
+        from semantic_classifier import SemanticClassifier
+        semantic_classifier = SemanticClassifier()
+    return ScreenAnalyzer(semantic_classifier)
+
+def monitor_worker(conn, stop_event, interval, analyzer_factory, factory_args):
+    """Worker process entry point: analyze the screen every `interval` seconds and send results."""
+    handler = RotatingFileHandler(MONITOR_LOG_FILE, maxBytes=5*1024*1024, backupCount=3)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(processName)s - %(levelname)s - %(message)s'))
+    # force: a spawned worker re-imports the main script, which may already have configured logging
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+    logger.info(f"Productivity monitor worker started (pid {os.getpid()})")
+
+    analyzer = analyzer_factory(*factory_args)
+    conn.send(('ready', time.time()))
+    while not stop_event.wait(interval):
+        start = time.perf_counter()
+        is_work_related, matched_keywords = analyzer.analyze()
+        conn.send(('result', (time.time(), is_work_related, matched_keywords, time.perf_counter() - start)))
+    conn.close()
+
+class ProductivityMonitor:
+    """Runs screen analysis in a supervised worker process.
+
+    Screenshots, image conversion and OCR never touch the main process, so they
+    cannot hold the GIL while tokens are being printed and handed to speech.
+    Only the small (timestamp, is_work_related, matched_keywords) result crosses
+    the pipe. The worker is restarted with backoff if it dies or stops
+    reporting.
+    """
+
+    def __init__(self, on_result, interval, analyzer_factory=create_screen_analyzer, factory_args=()):
+        self.on_result = on_result
+        self.interval = interval
+        self.analyzer_factory = analyzer_factory
+        self.factory_args = factory_args
+        # spawn avoids forking a process that already runs speech and audio threads
+        self.context = multiprocessing.get_context('spawn')
+        self.stop_event = self.context.Event()
+        self.process = None
+        self.conn = None
+        self.supervisor_thread = None
+        self.restarts = 0
+        self.last_seen = 0.0
+
+    def start(self):
+        self.stop_event.clear()
+        self.supervisor_thread = threading.Thread(target=self.supervise, name="MonitorSupervisor", daemon=True)
+        self.supervisor_thread.start()
+
+    def spawn_worker(self):
+        parent_conn, child_conn = self.context.Pipe(duplex=False)
+        self.process = self.context.Process(
+            target=monitor_worker, name="ProductivityMonitor", daemon=True,
+            args=(child_conn, self.stop_event, self.interval, self.analyzer_factory, self.factory_args))
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.last_seen = time.monotonic()
+        logger.info(f"Started productivity monitor process (pid {self.process.pid})")
+
+    def supervise(self):
+        """Forward worker results to the callback and restart the worker when it fails."""
+        backoff = 1
+        self.spawn_worker()
+        while not self.stop_event.is_set():
+            try:
+                if self.conn.poll(1):
+                    kind, payload = self.conn.recv()
+                    self.last_seen = time.monotonic()
+                    backoff = 1
+                    if kind == 'result':
+                        self.on_result(*payload)
+                    continue
+            except (EOFError, OSError):
+                pass  # Worker went away; handled below
+            except Exception as e:
+                logger.error(f"Error handling productivity monitor result: {e}")
+                continue
+
+            hung = time.monotonic() - self.last_seen > self.interval * HANG_FACTOR + 30
+            if self.process.is_alive() and not hung:
+                continue
+            if self.stop_event.is_set():
+                break
+            if hung and self.process.is_alive():
+                logger.error("Productivity monitor stopped responding, killing it")
+                self.process.kill()
+            self.process.join(timeout=5)
+            logger.error(f"Productivity monitor exited with code {self.process.exitcode}, restarting in {backoff} s")
+            self.conn.close()
+            if self.stop_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, RESTART_BACKOFF_MAX)
+            self.restarts += 1
+            self.spawn_worker()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.supervisor_thread:
+            self.supervisor_thread.join(timeout=5)
+        if self.process and self.process.is_alive():
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.kill()
+        logger.info(f"Productivity monitor stopped after {self.restarts} restarts")
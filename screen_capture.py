@@ -0,0 +1,169 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Constants
+CAPTURE_BACKEND = 'mss'  # 'mss' or 'pyautogui'
+MONITOR_INDEX = 1  # mss numbering: 0 = all monitors combined, 1 = primary, 2 = second...
+# Downscaling and binarizing are off until their keyword recall has been measured with
+# benchmarks/ocr_preprocess.py; halved Retina text is small enough to hurt Tesseract.
+OCR_DOWNSCALE = 1  # 0 = undo the display's pixel ratio (2 on Retina), otherwise a fixed factor (1 = none)
+OCR_BINARIZE = False
+
+# ITU-R BT.601 luma weights scaled to sum to 256, so grayscale is one shift
+LUMA_WEIGHTS = {'R': 77, 'G': 150, 'B': 29}
+HISTOGRAM_ROWS = 64
+
+class MssCapture:
+    """Grab a monitor with mss, returning a zero-copy BGRA view of the capture."""
+    channels = 'BGRA'
+
+    def __init__(self, monitor=MONITOR_INDEX):
+        import mss
+        self.mss = mss
+        self.monitor = monitor
+        self.sct = None
+        self.pixel_ratio = 1
+
+    def grab(self):
+        # mss handles are bound to the thread that created them, so open lazily
+        if self.sct is None:
+            self.sct = self.mss.mss()
+        monitors = self.sct.monitors
+        if self.monitor >= len(monitors):
+            logger.warning(f"Monitor {self.monitor} not found, using primary monitor")
+            self.monitor = 1
+        region = monitors[self.monitor]
+        shot = self.sct.grab(region)
+        self.pixel_ratio = max(1, round(shot.width / region['width']))
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def close(self):
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None
+
+class PyAutoGUICapture:
+    """Grab the screen with pyautogui (PIL). Slower, but works wherever pyautogui does."""
+    channels = 'RGB'
+
+    def __init__(self, monitor=MONITOR_INDEX):
+        import pyautogui
+        self.pyautogui = pyautogui
+        self.pixel_ratio = 1
+
+    def grab(self):
+        screenshot = self.pyautogui.screenshot()
+        logical_width = self.pyautogui.size()[0]
+        self.pixel_ratio = max(1, round(screenshot.width / logical_width))
+        return np.asarray(screenshot.convert('RGB'))
+
+    def close(self):
+        pass
+
+CAPTURE_BACKENDS = {
+    'mss': MssCapture,
+    'pyautogui': PyAutoGUICapture,
+}
+
+def create_capture_backend(name=CAPTURE_BACKEND, monitor=MONITOR_INDEX):
+    """Create the named capture backend, falling back to pyautogui if it is unavailable."""
+    try:
+        backend = CAPTURE_BACKENDS[name](monitor)
+    except ImportError as e:
+        if name == 'pyautogui':
+            raise
+        logger.warning(f"Capture backend '{name}' unavailable ({e}), falling back to pyautogui")
+        backend = PyAutoGUICapture(monitor)
+    logger.info(f"Using screen capture backend: {type(backend).__name__}")
+    return backend
+
+class OcrPreprocessor:
+    """Vectorized grayscale, downscale and binarize stage run before OCR.
+
+    Every full-frame work buffer, including the arrays returned, is kept
+    between calls and only reallocated when the frame size changes, so
+    periodic checks do not allocate full-frame arrays. Callers that keep a
+    result past the next call must copy it.
+    """
+
+    def __init__(self, downscale=OCR_DOWNSCALE, binarize=OCR_BINARIZE):
+        self.downscale = downscale
+        self.binarize = binarize
+        self.buffers = {}
+
+    def buffer(self, name, shape, dtype):
+        """Return the named work buffer, reallocating it only when the shape changes."""
+        array = self.buffers.get(name)
+        if array is None or array.shape != shape:
+            array = self.buffers[name] = np.empty(shape, dtype=dtype)
+        return array
+
+    def to_grayscale(self, frame, channels):
+        shape = frame.shape[:2]
+        scratch = self.buffer('gray16', shape, np.uint16)
+        term = self.buffer('term16', shape, np.uint16)
+        first = True
+        for channel, weight in LUMA_WEIGHTS.items():
+            plane = frame[..., channels.index(channel)]
+            if first:
+                np.multiply(plane, weight, out=scratch, dtype=np.uint16)
+                first = False
+            else:
+                np.multiply(plane, weight, out=term, dtype=np.uint16)
+                scratch += term
+        np.right_shift(scratch, 8, out=scratch)
+        gray = self.buffer('gray', shape, np.uint8)
+        np.copyto(gray, scratch, casting='unsafe')
+        return gray
+
+    def shrink(self, gray, factor):
+        """Downscale by an integer factor using block means."""
+        if factor <= 1:
+            return gray
+        height = gray.shape[0] // factor * factor
+        width = gray.shape[1] // factor * factor
+        shape = (height // factor, width // factor)
+        # Summing strided views is much faster than reshape().sum(axis=...) on large frames
+        summed = self.buffer('summed', shape, np.uint32)
+        summed.fill(0)
+        for row in range(factor):
+            for column in range(factor):
+                summed += gray[row:height:factor, column:width:factor]
+        summed //= factor * factor
+        small = self.buffer('small', shape, np.uint8)
+        np.copyto(small, summed, casting='unsafe')
+        return small
+
+    def threshold(self, gray):
+        """Binarize with Otsu's threshold, returning dark text on a light background."""
+        # bincount casts its input to intp, so count in row blocks rather than over the whole frame
+        histogram = np.zeros(256, dtype=np.float64)
+        for row in range(0, gray.shape[0], HISTOGRAM_ROWS):
+            histogram += np.bincount(gray[row:row + HISTOGRAM_ROWS].ravel(), minlength=256)
+        levels = np.arange(256, dtype=np.float64)
+        weight_below = np.cumsum(histogram)
+        weight_above = weight_below[-1] - weight_below
+        mass_below = np.cumsum(histogram * levels)
+        mean_below = mass_below / np.maximum(weight_below, 1)
+        mean_above = (mass_below[-1] - mass_below) / np.maximum(weight_above, 1)
+        between_variance = weight_below * weight_above * (mean_below - mean_above) ** 2
+        level = int(np.argmax(between_variance))
+        mask = self.buffer('mask', gray.shape, np.bool_)
+        binary = self.buffer('binary', gray.shape, np.uint8)
+        np.greater(gray, level, out=mask)
+        np.multiply(mask, 255, out=binary, dtype=np.uint8)
+        # Dark mode: most pixels are background, so flip if the background came out black
+        if np.count_nonzero(binary) < binary.size // 2:
+            np.subtract(255, binary, out=binary)
+        return binary
+
+    def process(self, frame, channels, pixel_ratio=1):
+        gray = self.to_grayscale(frame, channels)
+        factor = self.downscale or pixel_ratio
+        gray = self.shrink(gray, factor)
+        if self.binarize:
+            gray = self.threshold(gray)
+        return gray
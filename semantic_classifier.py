@@ -0,0 +1,270 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Constants
+EMBEDDING_URL = "http://localhost:8080/embedding"
+EXEMPLARS_FILE = 'exemplars.json'  # {"work": [...], "non_work": [...]}
+EXEMPLAR_EMBEDDINGS_SUFFIX = '.embeddings.npz'  # Exemplar vectors saved next to the exemplars file
+EMBED_BATCH_SIZE = 32
+EMBED_MAX_CHARS = 2000  # OCR text beyond this adds noise, not signal
+CACHE_SIZE = 4096  # Screen texts only; exemplars have their own store
+TOP_K = 5
+WORK_MARGIN = 0.0  # How much closer to work exemplars a screen must be to count as work
+STUB_DIMENSIONS = 256
+
+def normalize_text(text):
+    """Collapse whitespace so OCR jitter in spacing does not defeat the cache."""
+    return re.sub(r'\s+', ' ', text).strip()[:EMBED_MAX_CHARS]
+
+def text_key(text):
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+def embed_unit(embedder, texts, batch_size=EMBED_BATCH_SIZE):
+    """Yield (start, unit vectors) for texts, embedded in batches of `batch_size`."""
+    for start in range(0, len(texts), batch_size):
+        vectors = embedder.embed(texts[start:start + batch_size])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        yield start, vectors / np.maximum(norms, 1e-12)
+
+class LlamaEmbedder:
+    """Embed texts with the llama.cpp server's /embedding endpoint, several per request."""
+
+    def __init__(self, api_url=EMBEDDING_URL, timeout=30):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.identity = f"llama:{api_url}"
+
+    def embed(self, texts):
+        response = requests.post(self.api_url, json={"content": texts}, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        # Older servers answer {"embedding": [...]} for a single input, newer ones a
+        # list of {"index": i, "embedding": [...]}, possibly with per-token vectors
+        if isinstance(data, dict):
+            data = data.get('results', [data])
+        vectors = []
+        for item in sorted(data, key=lambda item: item.get('index', 0)):
+            vector = np.asarray(item['embedding'], dtype=np.float32)
+            if vector.ndim == 2:
+                vector = vector.mean(axis=0)
+            vectors.append(vector)
+        if len(vectors) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        return np.vstack(vectors)
+
+class HashingEmbedder:
+    """Offline stand-in for the embedding server: hashed bag of words and bigrams."""
+
+    def __init__(self, dimensions=STUB_DIMENSIONS):
+        self.dimensions = dimensions
+        self.identity = f"hashing:{dimensions}"
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r'[a-z0-9_]+', text.lower())
+            for feature in words + [a + ' ' + b for a, b in zip(words, words[1:])]:
+                digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                value = int.from_bytes(digest, 'little')
+                vectors[row, value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        return vectors
+
+class EmbeddingCache:
+    """LRU cache of unit-length embeddings keyed by the hash of the normalized text."""
+
+    def __init__(self, embedder, max_entries=CACHE_SIZE, batch_size=EMBED_BATCH_SIZE):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, texts):
+        """Return an (n, d) array of unit vectors, calling the embedder only for unseen texts."""
+        texts = [normalize_text(text) for text in texts]
+        keys = [text_key(text) for text in texts]
+        results = [None] * len(texts)
+        missing = {}
+        with self.lock:
+            for i, key in enumerate(keys):
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    results[i] = self.entries[key]
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+            self.misses += len(missing)
+
+        pending = list(missing.items())
+        pending_texts = [texts[indexes[0]] for _, indexes in pending]
+        for start, vectors in embed_unit(self.embedder, pending_texts, self.batch_size):
+            batch = pending[start:start + len(vectors)]
+            with self.lock:
+                for (key, indexes), vector in zip(batch, vectors):
+                    self.entries[key] = vector
+                    for i in indexes:
+                        results[i] = vector
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return np.vstack(results) if results else np.empty((0, 0), dtype=np.float32)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class ExemplarStore:
+    """Unit-length exemplar embeddings keyed by text hash, never evicted.
+
+    Kept apart from the screen-text LRU so thousands of exemplars neither push
+    screens out nor get pushed out themselves. With a path, vectors are saved
+    to disk, so restarts and edits to the exemplars file only embed new texts.
+    """
+
+    def __init__(self, embedder, path=None, batch_size=EMBED_BATCH_SIZE):
+        self.embedder = embedder
+        self.path = path
+        self.batch_size = batch_size
+        self.identity = getattr(embedder, 'identity', type(embedder).__name__)
+        self.entries = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        try:
+            with np.load(self.path) as data:
+                if str(data['identity']) != self.identity:
+                    logger.info(f"Ignoring {self.path}: embedded with {data['identity']}, not {self.identity}")
+                    return
+                self.entries = {row.tobytes(): vector for row, vector in zip(data['keys'], data['vectors'])}
+            logger.info(f"Loaded {len(self.entries)} exemplar embeddings from {self.path}")
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not load exemplar embeddings from {self.path}: {e}")
+
+    def save(self):
+        keys = list(self.entries)
+        vectors = np.vstack([self.entries[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as f:
+            # Raw uint8 rows: a bytes dtype would strip digests' trailing NUL bytes
+            key_rows = np.frombuffer(b''.join(keys), dtype=np.uint8).reshape(len(keys), -1)
+            np.savez(f, identity=self.identity, keys=key_rows, vectors=vectors)
+        os.replace(temporary, self.path)
+
+    def embed(self, texts):
+        """Return an (n, d) array for the exemplar texts, embedding only unseen ones.
+
+        Vectors for texts no longer in the exemplar set are dropped, so the
+        store tracks the current exemplars.
+        """
+        texts = [normalize_text(text) for text in texts]
+        keys = [text_key(text) for text in texts]
+        missing = {key: text for key, text in zip(keys, texts) if key not in self.entries}
+        if missing:
+            pending = list(missing.items())
+            for start, vectors in embed_unit(self.embedder, [text for _, text in pending], self.batch_size):
+                for (key, _), vector in zip(pending[start:start + len(vectors)], vectors):
+                    self.entries[key] = vector
+            dimensions = {vector.shape[0] for vector in self.entries.values()}
+            if len(dimensions) > 1:
+                # The embedding model changed behind the same endpoint: start over
+                logger.info("Exemplar embedding size changed, re-embedding all exemplars")
+                self.entries = {}
+                return self.embed(texts)
+        current = set(keys)
+        stale = [key for key in self.entries if key not in current]
+        for key in stale:
+            del self.entries[key]
+        if self.path and (missing or stale):
+            self.save()
+        logger.info(f"Embedded {len(missing)} new exemplars, reused {len(set(keys)) - len(missing)}")
+        return np.vstack([self.entries[key] for key in keys])
+
+class SemanticClassifier:
+    """Classify screen text as work or not by similarity to user-maintained exemplars.
+
+    Exemplars are read from a JSON file with "work" and "non_work" lists and
+    reloaded whenever the file changes; their embeddings are saved next to it.
+    A screen counts as work when the mean similarity of its TOP_K nearest work
+    exemplars beats the non-work ones.
+    """
+
+    def __init__(self, embedder=None, exemplars_file=EXEMPLARS_FILE, top_k=TOP_K, margin=WORK_MARGIN):
+        embedder = embedder or LlamaEmbedder()
+        self.cache = EmbeddingCache(embedder, max_entries=CACHE_SIZE)
+        self.exemplar_store = ExemplarStore(
+            embedder, exemplars_file + EXEMPLAR_EMBEDDINGS_SUFFIX if exemplars_file else None)
+        self.exemplars_file = exemplars_file
+        self.top_k = top_k
+        self.margin = margin
+        self.exemplars_mtime = None
+        self.matrix = None
+        self.is_work_exemplar = None
+        self.checks = 0
+        self.total_seconds = 0.0
+
+    def set_exemplars(self, work, non_work):
+        """Embed the exemplar texts into one matrix for vectorized similarity search."""
+        texts = list(work) + list(non_work)
+        if not work or not non_work:
+            raise ValueError("Need at least one work and one non-work exemplar")
+        self.matrix = self.exemplar_store.embed(texts)
+        self.is_work_exemplar = np.zeros(len(texts), dtype=bool)
+        self.is_work_exemplar[:len(work)] = True
+        logger.info(f"Loaded {len(work)} work and {len(non_work)} non-work exemplars")
+
+    def load_exemplars(self):
+        mtime = os.path.getmtime(self.exemplars_file)
+        if mtime != self.exemplars_mtime:
+            with open(self.exemplars_file) as f:
+                exemplars = json.load(f)
+            self.set_exemplars(exemplars.get('work', []), exemplars.get('non_work', []))
+            self.exemplars_mtime = mtime
+
+    def class_scores(self, vector):
+        similarities = self.matrix @ vector
+        scores = []
+        for mask in (self.is_work_exemplar, ~self.is_work_exemplar):
+            class_similarities = similarities[mask]
+            k = min(self.top_k, len(class_similarities))
+            scores.append(float(np.partition(class_similarities, -k)[-k:].mean()))
+        return scores
+
+    def classify(self, text):
+        """Return (is_work_related, work_score, non_work_score) for the given screen text."""
+        start = time.perf_counter()
+        if self.exemplars_file:
+            self.load_exemplars()
+        vector = self.cache.embed([text])[0]
+        work_score, non_work_score = self.class_scores(vector)
+        is_work_related = work_score >= non_work_score + self.margin
+
+        elapsed = time.perf_counter() - start
+        self.checks += 1
+        self.total_seconds += elapsed
+        logger.info(f"Semantic check: work-related = {is_work_related} (work {work_score:.3f}, "
+                    f"non-work {non_work_score:.3f}) in {elapsed * 1000:.1f} ms, "
+                    f"cache hit rate {self.cache.hit_rate:.0%}")
+        return is_work_related, work_score, non_work_score
+
+    def stats(self):
+        return {
+            'checks': self.checks,
+            'mean_latency': self.total_seconds / self.checks if self.checks else 0.0,
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'cache_hit_rate': self.cache.hit_rate,
+        }
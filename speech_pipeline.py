@@ -0,0 +1,224 @@
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Constants
+SYNTHESIS_WORKERS = 2
+SYNTHESIS_LOOKAHEAD = 3  # Segments synthesized ahead of the one playing
+DEFAULT_RATE = 200
+
+_worker_engine = None
+
+def synthesize_to_file(text, properties):
+    """Synthesize text to a temporary audio file with pyttsx3 and return its path.
+
+    Runs inside a pool worker; each worker process keeps its own engine because
+    pyttsx3 engines cannot be shared between threads or processes.
+    """
+    global _worker_engine
+    import pyttsx3
+    if _worker_engine is None:
+        _worker_engine = pyttsx3.init()
+    for name, value in properties.items():
+        _worker_engine.setProperty(name, value)
+    fd, path = tempfile.mkstemp(suffix='.aiff', prefix='speech_')
+    os.close(fd)
+    _worker_engine.save_to_file(text, path)
+    _worker_engine.runAndWait()
+    return path
+
+def play_file(path):
+    """Play a synthesized audio file to completion and remove it."""
+    try:
+        subprocess.run(['afplay', path], check=False)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class PlaybackMetrics:
+    """Records when each utterance was queued, started and finished playing."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.utterances = []
+
+    def record(self, queued_at, started_at, finished_at):
+        with self.lock:
+            self.utterances.append((queued_at, started_at, finished_at))
+
+    def gaps(self):
+        """Return the silence before each utterance that was caused by the engine.
+
+        Time spent waiting for the next sentence to be queued is not counted,
+        so slow token generation does not show up as synthesis latency.
+        """
+        with self.lock:
+            utterances = list(self.utterances)
+        gaps = []
+        for (_, _, prev_finished), (queued_at, started_at, _) in zip(utterances, utterances[1:]):
+            gaps.append(max(0.0, started_at - max(prev_finished, queued_at)))
+        return gaps
+
+    def summary(self):
+        gaps = sorted(self.gaps())
+        if not gaps:
+            return {'utterances': len(self.utterances), 'mean_gap': 0.0, 'p95_gap': 0.0, 'max_gap': 0.0}
+        return {
+            'utterances': len(self.utterances),
+            'mean_gap': sum(gaps) / len(gaps),
+            'p95_gap': gaps[min(len(gaps) - 1, int(len(gaps) * 0.95))],
+            'max_gap': gaps[-1],
+        }
+
+    def reset(self):
+        with self.lock:
+            self.utterances = []
+
+class PipelinedSpeechEngine:
+    """Speech engine that synthesizes upcoming segments while the current one plays.
+
+    Text passed to say() is synthesized to audio buffers on a worker pool, at
+    most `lookahead` segments ahead of playback. A single player thread consumes
+    the buffers strictly in order, so sentences play back to back. It exposes
+    the same interface as ThreadSafeSpeechEngine.
+
+    If a pool worker dies (e.g. the speech synthesizer crashes), the broken pool
+    is replaced and the affected segment is synthesized again, so one crash does
+    not silence the rest of the session.
+    """
+
+    def __init__(self, synthesize=synthesize_to_file, play=play_file,
+                 workers=SYNTHESIS_WORKERS, lookahead=SYNTHESIS_LOOKAHEAD, use_processes=True):
+        self.synthesize = synthesize
+        self.play = play
+        self.workers = workers
+        self.lookahead = lookahead
+        self.use_processes = use_processes
+        self.properties = {'rate': DEFAULT_RATE}
+        self.lock = threading.RLock()  # Reentrant: start() holds it while calling initialize()
+        self.text_queue = queue.Queue()
+        self.audio_queue = queue.Queue()
+        self.slots = threading.Semaphore(lookahead + 1)
+        self.executor = None
+        self.feeder_thread = None
+        self.player_thread = None
+        self.is_running = False
+        self.metrics = PlaybackMetrics()
+
+    def initialize(self):
+        with self.lock:
+            if self.executor is None:
+                logger.info(f"Starting speech synthesis pool with {self.workers} workers, lookahead {self.lookahead}")
+                pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+                self.executor = pool_class(max_workers=self.workers)
+
+    def say(self, text):
+        self.text_queue.put((text, time.perf_counter()))
+        self.start()
+
+    def submit_synthesis(self, text, properties):
+        """Submit text to the pool, replacing the pool once if it is broken."""
+        with self.lock:
+            executor = self.executor
+        try:
+            return executor.submit(self.synthesize, text, properties)
+        except BrokenExecutor:
+            self.replace_pool(executor)
+            with self.lock:
+                executor = self.executor
+            return executor.submit(self.synthesize, text, properties)
+
+    def replace_pool(self, broken):
+        """Swap a broken pool for a new one, unless another thread already has."""
+        with self.lock:
+            if self.executor is not broken:
+                return
+            logger.warning("Speech synthesis pool broke, starting a new one")
+            broken.shutdown(wait=False)
+            self.executor = None
+            self.initialize()
+
+    def feed_synthesis(self):
+        """Submit queued text for synthesis, staying at most `lookahead` segments ahead."""
+        while True:
+            item = self.text_queue.get()
+            if item is None:
+                self.audio_queue.put(None)
+                break
+            text, queued_at = item
+            self.slots.acquire()
+            with self.lock:
+                properties = dict(self.properties)
+            try:
+                future = self.submit_synthesis(text, properties)
+            except Exception as e:
+                logger.error(f"Failed to submit speech synthesis: {e}")
+                self.slots.release()
+                continue
+            self.audio_queue.put((text, properties, queued_at, future))
+
+    def play_audio(self):
+        """Play synthesized buffers in the order their text was queued."""
+        while True:
+            item = self.audio_queue.get()
+            if item is None:
+                break
+            text, properties, queued_at, future = item
+            try:
+                try:
+                    audio = future.result()
+                except BrokenExecutor:
+                    logger.warning(f"Speech synthesis worker died, retrying: {text[:50]}...")
+                    audio = self.submit_synthesis(text, properties).result()
+                logger.debug(f"Speaking: {text[:50]}...")  # Log first 50 chars
+                started_at = time.perf_counter()
+                self.play(audio)
+                self.metrics.record(queued_at, started_at, time.perf_counter())
+            except Exception as e:
+                logger.error(f"Error during speech playback: {e}")
+            finally:
+                self.slots.release()
+
+    def start(self):
+        # say() may be called from several threads (chat and productivity reminders)
+        with self.lock:
+            if self.is_running:
+                return
+            self.initialize()
+            self.is_running = True
+            self.feeder_thread = threading.Thread(target=self.feed_synthesis, name="SpeechSynthesisFeeder", daemon=True)
+            self.player_thread = threading.Thread(target=self.play_audio, name="SpeechPlayer", daemon=True)
+            self.feeder_thread.start()
+            self.player_thread.start()
+
+    def stop(self):
+        """Finish speaking everything queued so far, then shut the pool down."""
+        with self.lock:
+            was_running = self.is_running
+            self.is_running = False
+        if was_running:
+            self.text_queue.put(None)
+            self.feeder_thread.join()
+            self.player_thread.join()
+            gaps = self.metrics.summary()
+            logger.info(f"Speech gaps over {gaps['utterances']} utterances: "
+                        f"mean {gaps['mean_gap'] * 1000:.1f} ms, p95 {gaps['p95_gap'] * 1000:.1f} ms, "
+                        f"max {gaps['max_gap'] * 1000:.1f} ms")
+        with self.lock:
+            if self.executor:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+
+    def set_property(self, name, value):
+        """Set an engine property; applies to segments synthesized from now on."""
+        with self.lock:
+            self.properties[name] = value